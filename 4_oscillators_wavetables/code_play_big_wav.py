@@ -0,0 +1,19 @@
+# 4_oscillators_waveforms/code_play_big_wav.py
+# play a larger WAV as a synthio.Note, streaming it from the file
+# part of todbot circuitpython synthio tutorial
+#
+import time
+from synth_setup import mixer, synth, knobA, knobB, keys
+from wavplayer import WavPlayer
+
+player = WavPlayer("/amen1_22k_s16.wav", chunk_len=512, num_chunks=4, loop=True)
+print("duration:", player.duration, "samples:", player.num_samples, player.sample_rate)
+
+player.play(synth)
+last_print = time.monotonic()
+while True:
+    # sleep until just before the next chunk is due, instead of busy-spinning
+    time.sleep(player.update() * 0.5)
+    if time.monotonic() - last_print > 1:
+        last_print = time.monotonic()
+        print("underruns:", player.underruns, "late:", player.late)
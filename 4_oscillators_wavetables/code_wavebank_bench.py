@@ -0,0 +1,55 @@
+# 4_oscillators_waveforms/code_wavebank_bench.py
+# compare loading wavetables from separate WAVs vs a packed bank
+# part of todbot circuitpython synthio tutorial
+#
+# make the bank on your computer with:
+#   python3 make_wavebank.py wavetables wavetables.bank
+# and copy it and the "wavetables" directory to the CIRCUITPY drive
+#
+import os, time
+import adafruit_wave
+import ulab.numpy as np
+from wavebank import WaveBank
+
+wave_dir = "/wavetables/"
+bank_path = "/wavetables.bank"
+wavetables = sorted(f for f in os.listdir(wave_dir) if f.upper().endswith(".WAV"))
+
+def ms_since(st):
+    return (time.monotonic_ns() - st) / 1_000_000
+
+# the old way: open and parse each WAV, then read its waves
+st = time.monotonic_ns()
+for fname in wavetables:
+    w = adafruit_wave.open(wave_dir + fname)
+    waves = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    w.close()
+wav_ms = ms_since(st)
+print("WAV files: %d tables in %.1f ms, %.2f ms/table" %
+      (len(wavetables), wav_ms, wav_ms/len(wavetables)))
+
+# the bank way: parse the index once, then one seek & read per table
+st = time.monotonic_ns()
+bank = WaveBank(bank_path)
+open_ms = ms_since(st)
+buf = bytearray(64 * 256 * 2)
+st = time.monotonic_ns()
+for i in range(len(bank)):
+    table = bank.table(i, buf)
+bank_ms = ms_since(st)
+print("bank file: open %.1f ms, %d tables in %.1f ms, %.2f ms/table" %
+      (open_ms, len(bank), bank_ms, bank_ms/len(bank)))
+bank.deinit()
+
+# the bank in RAM: each table is just a view, if it fits
+try:
+    st = time.monotonic_ns()
+    bank = WaveBank(bank_path, in_ram=True)
+    open_ms = ms_since(st)
+    st = time.monotonic_ns()
+    for i in range(len(bank)):
+        table = bank.table(i)
+    ram_ms = ms_since(st)
+    print("bank in RAM: open %.1f ms, %d tables in %.3f ms" % (open_ms, len(bank), ram_ms))
+except MemoryError:
+    print("bank in RAM: doesn't fit")
@@ -14,6 +14,8 @@ wave_sine = np.array(np.sin(np.linspace(0, 2*np.pi, NUM, endpoint=False)) * VOL,
 wave_saw = np.linspace(VOL, -VOL, num=NUM, dtype=np.int16)
 # empty buffer we copy wave mix into
 wave_empty = np.zeros(NUM, dtype=np.int16)
+# scratch buffer to do the mixing math in, so no new arrays get made
+wave_mix = np.zeros(NUM, dtype=np.float)
 
 note = synthio.Note(frequency=220, waveform=wave_empty)
 synth.press(note)
@@ -21,11 +23,19 @@ synth.press(note)
 # mix between values a and b, works with numpy arrays too,  t ranges 0-1
 def lerp(a, b, t):  return (1-t)*a + t*b
 
+# same as lerp() but does the math in-place in "mix" and copies into "out"
+def lerp_into(out, a, b, t, mix):
+  mix[:] = b
+  mix -= a     # b-a
+  mix *= t     # (b-a)*t
+  mix += a     # a + (b-a)*t
+  out[:] = mix
+
 wave_pos = 0
 while True:
   print("%.2f" % wave_pos)
   mix_speed = 0.001 + (knobA.value/65535) * 0.2  # 0.001 - 0.2
-  note.waveform[:] = lerp(wave_sine, wave_saw, wave_pos)
+  lerp_into(note.waveform, wave_sine, wave_saw, wave_pos, wave_mix)
   note.frequency = synthio.midi_to_hz(48 + (knobB.value/65535)*12)
   wave_pos = (wave_pos + mix_speed) % 1.0  # move our mix position
   time.sleep(0.01)
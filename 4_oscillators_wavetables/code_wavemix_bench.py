@@ -0,0 +1,45 @@
+# 4_oscillators_waveforms/code_wavemix_bench.py
+# compare float lerp() vs in-place mix_into() for different wave sizes
+# part of todbot circuitpython synthio tutorial
+#
+import time, gc
+import ulab.numpy as np
+from wavetable import Wavetable, mix_into, new_mix_buffer
+
+VOL = 32000
+ITERATIONS = 1000
+
+def mem_free():
+    return gc.mem_free() if hasattr(gc, 'mem_free') else 0
+
+def bench(name, func):
+    """Run func ITERATIONS times, return microseconds per call & bytes used"""
+    gc.collect()
+    mem_start = mem_free()
+    t = 0
+    st = time.monotonic_ns()
+    for i in range(ITERATIONS):
+        func(t)
+        t = (t + 0.01) % 1.0
+    dt = time.monotonic_ns() - st
+    mem_used = mem_start - mem_free()
+    us = dt / ITERATIONS / 1000
+    print("%-10s %8.1f us/call  %8d bytes" % (name, us, mem_used))
+    return us
+
+for num in (128, 256, 512):
+    wave_sine = np.array(np.sin(np.linspace(0, 2*np.pi, num, endpoint=False)) * VOL, dtype=np.int16)
+    wave_saw = np.linspace(VOL, -VOL, num=num, dtype=np.int16)
+    waveform = np.zeros(num, dtype=np.int16)
+    mix_buf = new_mix_buffer(num)
+
+    def do_lerp(t):
+        waveform[:] = Wavetable.lerp(wave_sine, wave_saw, t)
+
+    def do_mix_into(t):
+        mix_into(waveform, wave_sine, wave_saw, t, mix_buf)
+
+    print("--- %d samples" % num)
+    us_lerp = bench("lerp", do_lerp)
+    us_mix = bench("mix_into", do_mix_into)
+    print("speedup: %.2fx" % (us_lerp / us_mix))
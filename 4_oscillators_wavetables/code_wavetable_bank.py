@@ -0,0 +1,35 @@
+# 4_oscillators_waveforms/code_wavetable_bank.py
+# like code_wavetable.py but switch wavetables instantly from a packed bank
+# part of todbot circuitpython synthio tutorial
+#
+# make the bank on your computer with:
+#   python3 make_wavebank.py wavetables wavetables.bank
+# and copy "wavetables.bank" to the CIRCUITPY drive
+#
+import time
+import synthio
+from synth_setup import synth, keys, knobA
+from wavetable import Wavetable
+from wavebank import WaveBank
+
+bank = WaveBank("/wavetables.bank")  # just reads the index
+print("bank has", len(bank), "wavetables:", bank.names)
+wti = 0  # index into bank
+table_buf = bytearray(64 * 256 * 2)  # reused for every table we load
+
+wavetable1 = Wavetable(bank.table(wti, table_buf))
+
+midi_note = 45  # A2
+note = synthio.Note(synthio.midi_to_hz(midi_note), waveform=wavetable1.waveform)
+synth.press(note)  # start note sounding
+pos = 0  # last knob position
+while True:
+    if key := keys.events.get():  # button pushed
+        if key.pressed:
+            wti = (wti+1) % len(bank)  # go to next index
+            wavetable1.set_table(bank.table(wti, table_buf))  # one seek & read
+    new_pos = (knobA.value / 65535) * wavetable1.num_waves
+    pos = int((new_pos*0.5) + pos*0.5)  # filter knob input
+    wavetable1.wave_pos = pos   # pick new wave
+    print("%s: wave num:%d" % (bank.names[wti], pos))
+    time.sleep(0.01)
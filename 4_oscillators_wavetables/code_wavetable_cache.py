@@ -0,0 +1,38 @@
+# 4_oscillators_waveforms/code_wavetable_cache.py
+# scan back and forth over a few waves, caching the mixed waves
+# part of todbot circuitpython synthio tutorial
+#
+import time
+import ulab.numpy as np
+import synthio
+from synth_setup import synth, knobA, knobB
+from wavetable import Wavetable, mix_cache_bytes
+
+wavetable_fname = "wavetables/PLAITS02.WAV"  # from http://waveeditonline.com/
+
+# quantize the mix between two waves to MIX_STEPS, and keep every mix of
+# the SCAN_WAVES scanned in the cache: (4*8+1) waves = 17kB. After the
+# first pass, scanning is just copying from the cache. A cache smaller
+# than the range scanned over and over never gets a hit
+START_WAVE = 24
+SCAN_WAVES = 4
+MIX_STEPS = 8
+wavetable1 = Wavetable(wavetable_fname, mix_steps=MIX_STEPS,
+                       cache_bytes=mix_cache_bytes(SCAN_WAVES, MIX_STEPS))
+
+midi_note = 48
+note = synthio.Note(synthio.midi_to_hz(midi_note), waveform=wavetable1.waveform)
+synth.press(note)
+
+# a triangle LFO, to scan up and back down the waves
+wave_lfo = synthio.LFO(rate=0.1, waveform=np.array((0,32767,0), dtype=np.int16))
+wave_lfo.scale = SCAN_WAVES
+wave_lfo.offset = START_WAVE
+synth.blocks.append(wave_lfo)  # this activates LFO when not attached to Note
+
+while True:
+    wavetable1.wave_pos =  wave_lfo.value
+    wave_lfo.rate = 0.05 + (knobA.value/65535) * 0.5
+    print("wave_pos:%.2f hits:%d misses:%d" % (wavetable1.wave_pos,
+          wavetable1.mix_cache.hits, wavetable1.mix_cache.misses))
+    time.sleep(0.05)
@@ -11,6 +11,7 @@ from wavetable import Wavetable
 
 wavetable_fname = "wavetables/PLAITS02.WAV"  # from http://waveeditonline.com/
 
+# all three share one copy of the wavetable, each has its own waveform & wave_pos
 wavetable1 = Wavetable(wavetable_fname)
 wavetable2 = Wavetable(wavetable_fname)
 wavetable3 = Wavetable(wavetable_fname)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# 4_oscillators_waveforms/make_wavebank.py
+# pack a directory of wavetable WAVs into one bank file for wavebank.py
+# part of todbot circuitpython synthio tutorial
+#
+# Run this on your computer, not on the board, then copy the bank
+# to the CIRCUITPY drive, e.g.:
+#   python3 make_wavebank.py wavetables wavetables.bank
+#
+import os
+import struct
+import sys
+import wave
+
+# bank file format, must match wavebank.py
+BANK_MAGIC = b"WTBK"
+BANK_VERSION = 1
+HEADER_FORMAT = "<4sHH"
+ENTRY_FORMAT = "<16sIHHI"
+
+def make_wavebank(wav_dir, bank_path, wave_len=256):
+    fnames = sorted(f for f in os.listdir(wav_dir) if f.lower().endswith(".wav"))
+    tables = []  # (name, num_waves, sample bytes, sample_rate)
+    for fname in fnames:
+        with wave.open(os.path.join(wav_dir, fname), "rb") as w:
+            if w.getsampwidth() != 2 or w.getnchannels() != 1:
+                print("skipping %s: not 16-bit mono" % fname)
+                continue
+            num_waves = w.getnframes() // wave_len
+            data = w.readframes(num_waves * wave_len)
+            tables.append((fname, num_waves, data, w.getframerate()))
+
+    offset = struct.calcsize(HEADER_FORMAT) + struct.calcsize(ENTRY_FORMAT) * len(tables)
+    with open(bank_path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, BANK_MAGIC, BANK_VERSION, len(tables)))
+        for name, num_waves, data, sample_rate in tables:
+            f.write(struct.pack(ENTRY_FORMAT, name.encode()[:16], offset,
+                                num_waves, wave_len, sample_rate))
+            offset += len(data)
+        for name, num_waves, data, sample_rate in tables:
+            f.write(data)
+    print("wrote %d tables to %s (%d bytes)" % (len(tables), bank_path, offset))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: make_wavebank.py <wav_dir> <bank_file> [wave_len]")
+        sys.exit(1)
+    wave_len = int(sys.argv[3]) if len(sys.argv) > 3 else 256
+    make_wavebank(sys.argv[1], sys.argv[2], wave_len)
@@ -0,0 +1,75 @@
+# 4_oscillators_waveforms/wavebank.py
+# load wavetables from a single packed bank file made by make_wavebank.py
+# part of todbot circuitpython synthio tutorial
+#
+# Bank file format, all little-endian:
+#   header: magic "WTBK", version (uint16), number of tables (uint16)
+#   index:  one entry per table: name (16 bytes, zero padded),
+#           byte offset of its data (uint32), num_waves (uint16),
+#           wave_len (uint16), sample_rate (uint32)
+#   data:   raw int16 samples of every table, back to back
+#
+import struct
+import ulab.numpy as np
+from wavetable import WaveBuffer
+
+BANK_MAGIC = b"WTBK"
+BANK_VERSION = 1
+HEADER_FORMAT = "<4sHH"
+ENTRY_FORMAT = "<16sIHHI"
+
+class WaveBank:
+    """A packed file of many wavetables, with an index for fast switching.
+    With `in_ram=True` the whole bank is read in at once and each table is
+    a view into it, otherwise each table is read with a single seek."""
+    def __init__(self, filepath, in_ram=False):
+        self.f = open(filepath, "rb")
+        magic, version, count = struct.unpack(HEADER_FORMAT,
+                                              self.f.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != BANK_MAGIC or version != BANK_VERSION:
+            raise ValueError("not a wavetable bank")
+        entry_size = struct.calcsize(ENTRY_FORMAT)
+        index = self.f.read(entry_size * count)
+        self.names = []
+        self.entries = []  # (offset, num_waves, wave_len, sample_rate)
+        for i in range(count):
+            name, offset, num_waves, wave_len, sample_rate = struct.unpack_from(
+                ENTRY_FORMAT, index, i * entry_size)
+            self.names.append(name.rstrip(b"\0").decode())
+            self.entries.append((offset, num_waves, wave_len, sample_rate))
+        self.data = None
+        if in_ram:
+            self.f.seek(0)
+            self.data = self.f.read()
+            self.f.close()
+            self.f = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def index(self, name):
+        """Get table number for a table name"""
+        return self.names.index(name)
+
+    def table(self, i, buf=None):
+        """Get table number i as a WaveBuffer. If the bank isn't in RAM,
+        its data is read into buf (a bytearray) or into a new buffer"""
+        offset, num_waves, wave_len, sample_rate = self.entries[i]
+        num_samples = num_waves * wave_len
+        if self.data is not None:
+            waves = np.frombuffer(self.data, dtype=np.int16,
+                                  count=num_samples, offset=offset)
+        else:
+            nbytes = num_samples * 2
+            if buf is None or len(buf) < nbytes:
+                buf = bytearray(nbytes)
+            self.f.seek(offset)
+            self.f.readinto(memoryview(buf)[:nbytes])
+            waves = np.frombuffer(buf, dtype=np.int16, count=num_samples)
+        return WaveBuffer(self.names[i], waves, wave_len, sample_rate)
+
+    def deinit(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+        self.data = None
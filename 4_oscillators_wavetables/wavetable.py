@@ -7,37 +7,303 @@ import ulab.numpy as np
 import synthio
 import adafruit_wave
 
-class Wavetable:
-    """ A 'waveform' for synthio.Note uses a WAV containing a wavetable
-    and provides a scannable wave position."""
-    def __init__(self, filepath, wave_len=256):
+# ulab has no int32 to hold a fixed-point (b-a)*t without overflowing,
+# so the mixing is float, but done in-place in one scratch buffer
+
+def new_mix_buffer(wave_len):
+    """Make the scratch buffer that mix_into() needs, once"""
+    return np.zeros(wave_len, dtype=np.float)
+
+def mix_into(out, a, b, t, mix_buf):
+    """Mix between waves a and b into out, t ranges 0-1.
+    All math is done in-place in mix_buf, so no new arrays are made"""
+    mix_buf[:] = b
+    mix_buf -= a      # b-a
+    mix_buf *= t      # (b-a)*t
+    mix_buf += a      # a + (b-a)*t
+    out[:] = mix_buf
+
+def mix_cache_bytes(num_waves, mix_steps, wave_len=256):
+    """RAM a MixCache needs to hold every mix of a scan across num_waves
+    waves. A cache smaller than the range scanned over and over evicts
+    each mix before the scan comes back to it, so it never hits"""
+    return (num_waves * mix_steps + 1) * wave_len * 2  # int16 = 2 bytes
+
+class MixCache:
+    """LRU cache of already-mixed waves, using at most max_bytes of RAM"""
+    def __init__(self, wave_len, max_bytes):
+        self.max_waves = max(1, max_bytes // (wave_len * 2))  # int16 = 2 bytes
+        self.waves = {}  # key -> mixed wave
+        self.order = []  # keys, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Get a mixed wave by key, or None if not cached"""
+        wave = self.waves.get(key)
+        if wave is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.order[-1] != key:  # mark as most recently used
+            self.order.remove(key)
+            self.order.append(key)
+        return wave
+
+    def put(self, key, wave):
+        """Store a copy of wave, evicting least recently used if full"""
+        if len(self.order) >= self.max_waves:
+            buf = self.waves.pop(self.order.pop(0))  # reuse evicted buffer
+        else:
+            buf = np.zeros(len(wave), dtype=np.int16)
+        buf[:] = wave
+        self.waves[key] = buf
+        self.order.append(key)
+
+    def clear(self):
+        self.waves = {}
+        self.order = []
+
+
+class WavetableData:
+    """The waves of a wavetable WAV, shared by all Wavetables using it.
+    Either the whole table in one int16 buffer, or an open WAV to read from"""
+    def __init__(self, filepath, wave_len=256, in_ram=True):
+        self.filepath = filepath
         self.w = adafruit_wave.open(filepath)
-        self.wave_len = wave_len  # how many samples in each wave
         if self.w.getsampwidth() != 2 or self.w.getnchannels() != 1:
             raise ValueError("unsupported WAV format")
-        # empty buffer we'll copy into
-        self.waveform = np.zeros(wave_len, dtype=np.int16)
-        self.num_waves = self.w.getnframes() // self.wave_len
+        self.wave_len = wave_len  # how many samples in each wave
         self.num_samples = self.w.getnframes()
+        self.num_waves = self.num_samples // wave_len
         self.sample_rate = self.w.getframerate()
-        self.wave_pos = 0
+        self.waves = None  # all waves in one buffer, if loaded into RAM
+        self.key = None  # key in shared tables, set by open_table()
+        self.refcount = 0
+        if in_ram:
+            self.w.setpos(0)
+            self.waves = np.frombuffer(self.w.readframes(self.num_samples),
+                                       dtype=np.int16)
+            self.w.close()  # don't need the file anymore
+            self.w = None
+
+    def get_wave(self, wave_num):
+        """Get a single wave from the wavetable, a slice if in RAM"""
+        samp_pos = wave_num * self.wave_len  # get sample position
+        if self.waves is not None:
+            return self.waves[samp_pos : samp_pos + self.wave_len]
+        self.w.setpos(samp_pos)
+        return np.frombuffer(self.w.readframes(self.wave_len), dtype=np.int16)
+
+    def close(self):
+        if self.w:
+            self.w.close()
+            self.w = None
+        self.waves = None
+
+class WaveBuffer:
+    """The waves of a wavetable already in a buffer, usable like a
+    WavetableData, e.g. from a WaveBank or a WavetableLoader"""
+    def __init__(self, name, waves, wave_len, sample_rate):
+        self.filepath = name
+        self.waves = waves
+        self.wave_len = wave_len
+        self.num_samples = len(waves)
+        self.num_waves = self.num_samples // wave_len
+        self.sample_rate = sample_rate
+        self.key = None  # not in the shared wavetable store
+        self.refcount = 0
+
+    def get_wave(self, wave_num):
+        """Get a single wave from the table, as a slice"""
+        samp_pos = wave_num * self.wave_len
+        return self.waves[samp_pos : samp_pos + self.wave_len]
+
+    def close(self):
+        pass  # whoever made us owns the buffer
+
+# every WavetableData loaded, keyed by (filepath, wave_len, in_ram)
+_tables = {}
+
+def open_table(filepath, wave_len=256, in_ram=True):
+    """Get the shared WavetableData for a WAV, loading it if needed"""
+    key = (filepath, wave_len, in_ram)
+    table = _tables.get(key)
+    if table is None:
+        table = WavetableData(filepath, wave_len, in_ram)
+        table.key = key
+        _tables[key] = table
+    table.refcount += 1
+    return table
+
+def close_table(table):
+    """Done with a WavetableData, free it if nothing else is using it"""
+    table.refcount -= 1
+    if table.refcount <= 0:
+        if _tables.get(table.key) is table:
+            del _tables[table.key]
+        table.close()
+
+class Wavetable:
+    """ A 'waveform' for synthio.Note uses a WAV containing a wavetable
+    and provides a scannable wave position.
+
+    By default the whole wavetable is read into RAM once, so changing
+    `wave_pos` does no file I/O. Use `in_ram=False` for wavetables too
+    big for RAM, to read the two waves needed from the file each time.
+    Wavetables made from the same WAV share one copy of its waves,
+    each just has its own `waveform` buffer and `wave_pos`.
+    Call `deinit()` when done so the shared waves can be freed.
+    Instead of a filepath, an already-loaded table (like a WaveBuffer
+    from `WaveBank.table()`) can be given.
+
+    Set `mix_steps` to quantize the position between two waves to that
+    many steps, and `cache_bytes` to keep up to that much RAM of already
+    mixed waves, so scans mostly just copy from the cache. It only helps
+    if it can hold all the mixes of the range being scanned, size it
+    with `mix_cache_bytes()`."""
+    def __init__(self, filepath, wave_len=256, in_ram=True,
+                 mix_steps=0, cache_bytes=0):
+        self.wave_len = wave_len  # how many samples in each wave
+        # empty buffer we'll copy into
+        self.waveform = np.zeros(wave_len, dtype=np.int16)
+        self.mix_buf = new_mix_buffer(wave_len)  # scratch space for mixing
+        self.mix_steps = mix_steps
+        self.mix_cache = None
+        if mix_steps and cache_bytes:
+            self.mix_cache = MixCache(wave_len, cache_bytes)
+        self.table = None
+        if isinstance(filepath, str):
+            table = open_table(filepath, wave_len, in_ram)
+        else:
+            table = filepath  # already loaded, like from a WaveBank
+        self.set_table(table)
+
+    def set_table(self, table):
+        """Switch to a different WavetableData or WaveBuffer,
+        keeping our waveform buffer and wave_pos"""
+        if table.wave_len != self.wave_len:
+            raise ValueError("wave_len mismatch")
+        old_table = self.table
+        self.table = table
+        self.num_waves = table.num_waves
+        self.num_samples = table.num_samples
+        self.sample_rate = table.sample_rate
+        if self.mix_cache:
+            self.mix_cache.clear()
+        self._mix_key = None  # which mix is in waveform now
+        self.wave_pos = self._wave_pos if old_table else 0
+        if old_table:
+            close_table(old_table)
+
+    def get_wave(self, wave_num):
+        """Get a single wave from the wavetable"""
+        return self.table.get_wave(wave_num)
+
+    def deinit(self):
+        """Stop using the shared wavetable data"""
+        if self.table:
+            close_table(self.table)
+            self.table = None
 
     @property
     def wave_pos(self): return self._wave_pos
-    
+
     @wave_pos.setter
     def wave_pos(self, pos):
         """Pick where in wavetable to be, morphing between waves"""
         pos = min(max(pos, 0), self.num_waves-1)  # constrain
-        samp_pos = int(pos) * self.wave_len  # get sample position
-        self.w.setpos(samp_pos)  
-        waveA = np.frombuffer(self.w.readframes(self.wave_len), dtype=np.int16)
-        self.w.setpos(samp_pos + self.wave_len)  # one wave up
-        waveB = np.frombuffer(self.w.readframes(self.wave_len), dtype=np.int16)
-        pos_frac = pos - int(pos)  # fractional position between wave A & B
-        # mix waveforms A & B
-        self.waveform[:] = Wavetable.lerp(waveA, waveB, pos_frac)
+        wave_num = int(pos)
+        pos_frac = pos - wave_num  # fractional position between wave A & B
         self._wave_pos = pos
+        key = None
+        if self.mix_steps:  # quantize pos_frac, key is (wave_num, step)
+            step = int(pos_frac * self.mix_steps + 0.5)
+            if step == self.mix_steps:  # that's the next wave, same mix
+                wave_num, step = wave_num + 1, 0
+            pos_frac = step / self.mix_steps
+            key = wave_num * self.mix_steps + step
+            if key == self._mix_key:
+                return  # already in waveform
+            self._mix_key = key
+            if self.mix_cache and (wave := self.mix_cache.get(key)) is not None:
+                self.waveform[:] = wave
+                return
+        waveA = self.get_wave(wave_num)
+        waveB = self.get_wave(min(wave_num+1, self.num_waves-1))  # one wave up
+        # mix waveforms A & B
+        mix_into(self.waveform, waveA, waveB, pos_frac, self.mix_buf)
+        if self.mix_cache:
+            self.mix_cache.put(key, self.waveform)
 
     # mix between values a and b, works with numpy arrays too, t ranges 0-1
     def lerp(a, b, t):  return (1-t)*a + t*b
+
+
+class WavetableLoader:
+    """Load the next wavetable for a Wavetable in the background, a chunk
+    at a time, so the main loop never stalls on a whole WAV.
+    Call `load()` to start, `update()` every loop to read `chunk_size`
+    samples, and `swap()` to switch the Wavetable over to it.
+    Two buffers are used in turn: one playing, one being loaded."""
+    def __init__(self, wavetable, chunk_size=1024):
+        self.wavetable = wavetable
+        self.chunk_size = chunk_size  # samples read per update()
+        self.bufs = [None, None]
+        self.back = 0  # which of bufs is being loaded into
+        self.w = None
+        self.filepath = None
+        self.num_samples = 0
+        self.loaded = 0  # samples loaded so far
+        self.sample_rate = 0
+
+    @property
+    def ready(self):
+        """True if a wavetable is completely loaded and ready to swap()"""
+        return self.filepath is not None and self.w is None
+
+    def load(self, filepath):
+        """Start loading a new wavetable WAV"""
+        if self.w:
+            self.w.close()
+        self.w = adafruit_wave.open(filepath)
+        if self.w.getsampwidth() != 2 or self.w.getnchannels() != 1:
+            raise ValueError("unsupported WAV format")
+        self.filepath = filepath
+        self.sample_rate = self.w.getframerate()
+        wave_len = self.wavetable.wave_len
+        self.num_samples = (self.w.getnframes() // wave_len) * wave_len
+        self.loaded = 0
+        buf = self.bufs[self.back]
+        if buf is None or len(buf) < self.num_samples * 2:
+            buf = bytearray(self.num_samples * 2)
+            self.bufs[self.back] = buf
+
+    def update(self):
+        """Load the next chunk, returns True when all loaded"""
+        if self.w is None:
+            return self.filepath is not None
+        n = min(self.chunk_size, self.num_samples - self.loaded)
+        buf = self.bufs[self.back]
+        buf[self.loaded*2 : (self.loaded+n)*2] = self.w.readframes(n)
+        self.loaded += n
+        if self.loaded >= self.num_samples:
+            self.w.close()
+            self.w = None
+            return True
+        return False
+
+    def swap(self):
+        """Switch the Wavetable to the loaded wavetable, finishing
+        loading first if it's not done yet"""
+        if self.filepath is None:
+            return
+        while not self.update():
+            pass
+        waves = np.frombuffer(self.bufs[self.back], dtype=np.int16,
+                              count=self.num_samples)
+        self.wavetable.set_table(WaveBuffer(self.filepath, waves,
+                                            self.wavetable.wave_len,
+                                            self.sample_rate))
+        self.back = 1 - self.back  # old buffer now free to load into
+        self.filepath = None
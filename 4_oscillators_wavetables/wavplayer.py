@@ -0,0 +1,118 @@
+# 4_oscillators_waveforms/wavplayer.py
+# play a WAV too big for RAM through a synthio.Note, a chunk at a time
+# part of todbot circuitpython synthio tutorial
+#
+import time
+import ulab.numpy as np
+import synthio
+import adafruit_wave
+
+class WavPlayer:
+    """Streams a WAV file through a synthio.Note whose waveform is a ring
+    of `num_chunks` chunks, played once per cycle, so the note's play head
+    goes through the ring in order. Where the play head is gets worked out
+    from time.monotonic_ns(), and `update()` reads the next part of the
+    file into each chunk the play head has finished with. `num_chunks`
+    must be at least 3: one playing, one just played, one read ahead.
+    Chunks refilled a whole chunk late are counted in `late`, and chunks
+    the play head got to before they were refilled in `underruns`."""
+    def __init__(self, filepath, chunk_len=512, num_chunks=4, loop=False):
+        self.w = adafruit_wave.open(filepath)
+        if self.w.getsampwidth() != 2 or self.w.getnchannels() != 1:
+            raise ValueError("unsupported WAV format")
+        self.sample_rate = self.w.getframerate()
+        self.num_samples = self.w.getnframes()
+        if num_chunks < 3:
+            raise ValueError("num_chunks must be at least 3")
+        self.chunk_len = chunk_len
+        self.num_chunks = num_chunks
+        self.loop = loop
+        # the whole ring is the note's waveform, it plays through once a cycle
+        self.ring = np.zeros(chunk_len * num_chunks, dtype=np.int16)
+        self.note = synthio.Note(frequency=self.sample_rate / len(self.ring),
+                                 waveform=self.ring,
+                                 envelope=synthio.Envelope(attack_time=0,
+                                                           attack_level=1,
+                                                           sustain_level=1))
+        # the last chunk with any of the WAV in it, if not looping
+        self.end_chunk = (self.num_samples + chunk_len - 1) // chunk_len
+        self.underruns = 0  # chunks the play head reached before they were read
+        self.late = 0       # chunks read a whole chunk or more after they could be
+        self.playing = False
+        self.rewind()
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sample_rate
+
+    def rewind(self):
+        """Go back to the start of the WAV and fill the ring"""
+        self.w.setpos(0)
+        self.file_pos = 0  # next sample to read from the file
+        self.filled = 0    # chunks read into the ring so far, from the start
+        while self.filled < self.num_chunks:
+            self.read_chunk()
+
+    def read_chunk(self):
+        """Read the next chunk of the file into its place in the ring"""
+        pos = (self.filled % self.num_chunks) * self.chunk_len
+        chunk = self.ring[pos : pos + self.chunk_len]
+        n = 0
+        while n < self.chunk_len:
+            if self.file_pos >= self.num_samples:
+                if not self.loop:
+                    chunk[n:] = 0  # pad out the end with silence
+                    break
+                self.w.setpos(0)
+                self.file_pos = 0
+            m = min(self.chunk_len - n, self.num_samples - self.file_pos)
+            chunk[n:n+m] = np.frombuffer(self.w.readframes(m), dtype=np.int16)
+            self.file_pos += m
+            n += m
+        self.filled += 1
+
+    def skip_chunk(self):
+        """Skip over the next chunk of the file, for after an underrun"""
+        self.file_pos += self.chunk_len
+        if self.loop:
+            self.file_pos %= self.num_samples
+        self.w.setpos(min(self.file_pos, self.num_samples))
+        self.filled += 1
+
+    def play(self, synth):
+        """Start the note playing on synth"""
+        self.synth = synth
+        synth.press(self.note)
+        self.playing = True
+        self.start_ns = time.monotonic_ns()
+
+    def stop(self):
+        if self.playing:
+            self.synth.release(self.note)
+        self.playing = False
+
+    def update(self):
+        """Call this often. Refills the chunks the play head has passed.
+        Returns seconds until the play head passes the next chunk"""
+        if not self.playing:
+            return 0
+        now = time.monotonic_ns() - self.start_ns
+        played = now * self.sample_rate // 1_000_000_000  # samples played
+        head = played // self.chunk_len  # chunk playing now, from the start
+        if not self.loop and head >= self.end_chunk:
+            self.stop()  # played the last chunk
+            return 0
+        if self.filled <= head:  # it's playing chunks that weren't read yet
+            self.underruns += head - self.filled + 1
+            while self.filled <= head:
+                self.skip_chunk()
+            pos = (head % self.num_chunks) * self.chunk_len
+            self.ring[pos : pos + self.chunk_len] = 0  # not an old chunk again
+        # a chunk is refilled once the play head is a chunk past it, since
+        # synthio starts the note when it next makes a buffer, a bit late
+        if head - (self.filled - self.num_chunks) > 2:
+            self.late += 1
+        while self.filled < head + self.num_chunks - 1:
+            self.read_chunk()
+        next_ns = (head + 1) * self.chunk_len * 1_000_000_000 // self.sample_rate
+        return max(0, next_ns - now) / 1_000_000_000
@@ -0,0 +1,26 @@
+# 7_synth_voice/code_bench_import.py
+# how long does importing todsynth take, and making its waveforms?
+# part of todbot circuitpython synthio tutorial
+#
+import time, gc
+
+def mem_free():
+    return gc.mem_free() if hasattr(gc, 'mem_free') else 0
+
+gc.collect()
+mem_start = mem_free()
+st = time.monotonic_ns()
+import todsynth
+from todsynth.waveforms import get_waveform, SHAPES
+dt = time.monotonic_ns() - st
+print("import todsynth: %.1f ms, %d bytes" % (dt/1_000_000, mem_start - mem_free()))
+
+for shape in SHAPES:
+    st = time.monotonic_ns()
+    get_waveform(shape)  # first time, makes it
+    dt_first = time.monotonic_ns() - st
+    st = time.monotonic_ns()
+    get_waveform(shape)  # second time, from cache
+    dt_again = time.monotonic_ns() - st
+    print("%-7s first: %7.1f us  cached: %5.1f us" %
+          (shape, dt_first/1000, dt_again/1000))
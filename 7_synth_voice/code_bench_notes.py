@@ -0,0 +1,73 @@
+# 7_synth_voice/code_bench_notes.py
+# note bookkeeping throughput: Synth's old notes_pressed dict vs NoteTable
+# part of todbot circuitpython synthio tutorial
+#
+import time
+import synthio
+import todsynth
+
+ITERATIONS = 2000
+notes = (48, 52, 55, 60, 64, 67, 72, 76)
+
+def bench(name, func):
+    st = time.monotonic_ns()
+    func()
+    dt = time.monotonic_ns() - st
+    events = ITERATIONS * len(notes) * 2  # a press and a release per note
+    print("%-22s %8.0f events/sec" % (name, events / (dt / 1_000_000_000)))
+
+class OldSynth:
+    """is_pressed(), add_note() & del_note() as todsynth.Synth had them"""
+    def __init__(self):
+        self.notes_pressed = {}
+
+    def is_pressed(self, midi_note):
+        return self.notes_pressed.get(midi_note, None)
+
+    def add_note(self, midi_note, note):
+        self.notes_pressed[midi_note] = note
+
+    def del_note(self, midi_note):
+        self.notes_pressed[midi_note] = None
+
+synth = synthio.Synthesizer(sample_rate=44100)
+tsynth = todsynth.Synth(synth, num_voices=len(notes))
+old = OldSynth()
+
+def events(s):
+    """What press() and release() do with the note bookkeeping"""
+    def run():
+        for i in range(ITERATIONS):
+            for n in notes:
+                s.is_pressed(n)
+                s.add_note(n, n)
+            for n in notes:
+                s.is_pressed(n)
+                s.del_note(n)
+    return run
+
+def count_events(s, count):
+    """The same, also asking how many notes are sounding after each event"""
+    def run():
+        for i in range(ITERATIONS):
+            for n in notes:
+                s.is_pressed(n)
+                s.add_note(n, n)
+                count()
+            for n in notes:
+                s.is_pressed(n)
+                s.del_note(n)
+                count()
+    return run
+
+def old_count():  # the dict keeps released notes, so look at every entry
+    return sum(1 for v in old.notes_pressed.values() if v)
+
+def table_count():
+    return tsynth.num_pressed
+
+bench("dict", events(old))
+bench("NoteTable", events(tsynth))
+bench("dict + count", count_events(old, old_count))
+bench("NoteTable + count", count_events(tsynth, table_count))
+tsynth.release_all()
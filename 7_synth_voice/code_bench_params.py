@@ -0,0 +1,29 @@
+# 7_synth_voice/code_bench_params.py
+# how many Synth.set_parameter() calls per second with all voices playing
+# part of todbot circuitpython synthio tutorial
+#
+import time
+import synthio
+import todsynth
+
+ITERATIONS = 1000
+NUM_VOICES = 8
+
+synth = synthio.Synthesizer(sample_rate=44100)
+tsynth = todsynth.Synth(synth, num_voices=NUM_VOICES)
+for i in range(NUM_VOICES):  # full polyphony
+    tsynth.press(48 + i*3)
+
+params = (
+    ('filter_freq', lambda i: 500 + (i % 100) * 30),
+    ('filter_res', lambda i: 0.7 + (i % 10) * 0.1),
+    ('release_time', lambda i: 0.1 + (i % 10) * 0.1),
+    ('detune', lambda i: 1 + (i % 10) * 0.001),
+)
+for name, value_for in params:
+    st = time.monotonic_ns()
+    for i in range(ITERATIONS):
+        tsynth.set_parameter(name, value_for(i))
+    dt = time.monotonic_ns() - st
+    print("%-13s %8.0f updates/sec at %d voices" %
+          (name, ITERATIONS / (dt / 1_000_000_000), NUM_VOICES))
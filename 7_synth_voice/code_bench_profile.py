@@ -0,0 +1,26 @@
+# 7_synth_voice/code_bench_profile.py
+# record press/release/update timings with a todsynth.Profiler, then dump them
+# part of todbot circuitpython synthio tutorial
+#
+import time, random
+import todsynth
+from synth_setup import synth
+
+profiler = todsynth.Profiler(size=128)
+tsynth = todsynth.Synth(synth, todsynth.Patch('profiled'), profiler=profiler)
+tsynth.connect_param_to_cc('filter_freq', 74, 4000)
+
+notes = (48, 52, 55, 60, 64, 67, 72)
+for i in range(200):
+    midi_note = random.choice(notes)
+    tsynth.press(midi_note, velocity=random.randint(40, 127))
+    tsynth.control_change(74, random.randint(0, 127))
+    tsynth.update()
+    time.sleep(0.01)
+    if random.random() < 0.7:
+        tsynth.release(midi_note)
+    tsynth.update()
+    time.sleep(0.01)
+tsynth.release_all()
+
+profiler.dump()
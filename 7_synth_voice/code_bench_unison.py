@@ -0,0 +1,46 @@
+# 7_synth_voice/code_bench_unison.py
+# how much CPU do unison voices take, with and without shared filters
+# part of todbot circuitpython synthio tutorial
+#
+import time
+import todsynth
+from synth_setup import synth
+
+UNISON = 3
+CPU_LIMIT = 0.8  # stop adding voices when this much CPU is in use
+
+def loops_per_sec(duration=0.5):
+    """Count trips around a tiny loop. Making audio steals time from it,
+    so the fewer trips compared to silence, the more CPU audio is using"""
+    n = 0
+    end = time.monotonic_ns() + int(duration * 1_000_000_000)
+    while time.monotonic_ns() < end:
+        n += 1
+    return n / duration
+
+patch = todsynth.Patch('unison')
+patch.unison = UNISON
+patch.detune = 1.005
+patch.release_time = 0.1
+
+time.sleep(1)
+idle = loops_per_sec()
+print("idle: %d loops/sec" % idle)
+
+for share_filters in (True, False):
+    tsynth = todsynth.Synth(synth, patch, share_filters=share_filters)
+    max_voices = 0
+    # synthio plays at most 12 notes, so that's 4 voices of 3 unison notes
+    for v in range(len(tsynth.pool.voices)):
+        tsynth.press(40 + v*7)
+        time.sleep(0.2)  # let the filter envelopes settle
+        cpu = 1 - loops_per_sec() / idle
+        print("shared:%s voices:%d notes:%2d cpu:%3d%%" %
+              (share_filters, v+1, (v+1)*UNISON, cpu*100))
+        if cpu > CPU_LIMIT:
+            break
+        max_voices = v+1
+    print("shared:%s => %d voices under %d%% CPU, %.1f%% CPU per voice" %
+          (share_filters, max_voices, CPU_LIMIT*100, cpu*100/(v+1)))
+    tsynth.release_all()
+    time.sleep(0.5)
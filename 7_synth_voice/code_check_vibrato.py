@@ -0,0 +1,28 @@
+# 7_synth_voice/code_check_vibrato.py
+# check that vibrato wobbles note.bend around 0, and doesn't shift the pitch
+# part of todbot circuitpython synthio tutorial
+#
+import time
+import todsynth
+from synth_setup import synth
+
+patch = todsynth.Patch('vibrato')
+patch.vibrato_rate = 5
+patch.vibrato_depth = 0.2  # in semitones
+
+tsynth = todsynth.Synth(synth, patch, num_voices=4)
+tsynth.press(60)
+note = tsynth.is_pressed(60).notes[0]
+
+limit = patch.vibrato_depth / 12 + 0.001  # note.bend is in octaves
+lowest, highest = 0, 0
+for i in range(100):
+    time.sleep(0.01)
+    bend = note.bend.value
+    lowest, highest = min(lowest, bend), max(highest, bend)
+print("note.bend went from %.4f to %.4f octaves" % (lowest, highest))
+if lowest < -limit or highest > limit:
+    print("FAIL: vibrato should stay within +/-%.4f octaves" % limit)
+else:
+    print("ok")
+tsynth.release_all()
@@ -1,4 +1,11 @@
 
 from todsynth.note import Note
 from todsynth.patch import Patch
+from todsynth.patchbank import PatchBank, save_patches
+from todsynth.mipmap import WaveMipmap
+from todsynth.voicepool import VoicePool
+from todsynth.modmatrix import ModMatrix
+from todsynth.envelope_pool import EnvelopePool
+from todsynth.modgraph import ModGraph
+from todsynth.profiler import Profiler
 from todsynth.synth import Synth
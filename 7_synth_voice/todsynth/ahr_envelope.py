@@ -24,14 +24,14 @@ class AHREnvelope:
 
     def press(self):
         """Call this method right before synth.press()"""
-        self.env.a = self.smin 
-        self.env.b = self.smax
+        self.env.a = self.min
+        self.env.b = self.max
         self.lerp.rate = 1/self.attack_time
         self.lerp.retrigger()
     
     def release(self):
         """Call this method right before synth.release()"""
         self.env.a = self.env.value  # curr val is new start value
-        self.env.b = self.smin
+        self.env.b = self.min
         self.lerp.rate = 1/self.release_time
         self.lerp.retrigger()
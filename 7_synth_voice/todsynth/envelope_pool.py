@@ -0,0 +1,22 @@
+
+class EnvelopePool:
+    """Envelopes (AHREnvelope, FilterEnvelope or anything with press() and
+    release()) made once up front, one per voice slot, so pressing a note
+    never makes a new one. Get a slot's envelope with pool[slot], its
+    press() resets it for a new note"""
+    def __init__(self, num_slots, make_env):
+        self.make_env = make_env  # function that makes one envelope
+        self.envs = []
+        self.resize(num_slots)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def __getitem__(self, slot):
+        return self.envs[slot]
+
+    def resize(self, num_slots):
+        """Change the number of slots, keeping existing envelopes"""
+        while len(self.envs) < num_slots:
+            self.envs.append(self.make_env())
+        del self.envs[num_slots:]
@@ -0,0 +1,73 @@
+
+import synthio
+
+class FilterFactory:
+    """Hands out synthio filters, making as few new ones as it can.
+    Static filters (fixed frequency and Q) are shared by everyone asking for
+    the same (mode, frequency, Q), keeping the `max_static` most recently
+    asked for. Modulated filters, whose frequency is driven by a block,
+    can't be shared, so they're given back with recycle() when done and
+    handed out again, keeping up to `max_spare` spares"""
+    def __init__(self, max_static=16, max_spare=16):
+        self.max_static = max_static
+        self.max_spare = max_spare
+        self.static = {}  # (mode, frequency, Q) -> synthio.Biquad
+        self.static_order = []  # keys of static, least recently used first
+        self.spares = []  # recycled modulated filters, (mode, Biquad)
+        self.made = 0  # filter objects made
+        self.reused = 0  # filter requests handled without making one
+
+    def get_static(self, mode, frequency, Q):
+        """Get a filter that never changes, shared with others like it"""
+        key = (mode, frequency, Q)
+        filter = self.static.get(key)
+        if filter is not None:
+            self.reused += 1
+            if self.static_order[-1] != key:
+                self.static_order.remove(key)
+                self.static_order.append(key)
+            return filter
+        if len(self.static_order) >= self.max_static:
+            del self.static[self.static_order.pop(0)]  # evict oldest
+        filter = synthio.Biquad(mode, frequency=frequency, Q=Q)
+        self.made += 1
+        self.static[key] = filter
+        self.static_order.append(key)
+        return filter
+
+    def retune(self, filter, frequency, Q):
+        """Change a static filter's frequency and Q in place, instead of
+        getting a new one, keeping it cached under its new settings"""
+        filter.frequency = frequency
+        filter.Q = Q
+        for key in self.static_order:
+            if self.static[key] is filter:
+                break
+        else:
+            return  # not one of ours, or evicted
+        self.static_order.remove(key)
+        del self.static[key]
+        new_key = (key[0], frequency, Q)
+        if new_key in self.static:  # forget the one already there
+            self.static_order.remove(new_key)
+        self.static[new_key] = filter
+        self.static_order.append(new_key)
+
+    def get_modulated(self, mode, frequency, Q):
+        """Get a filter of its own for a modulated frequency (a block)"""
+        for i in range(len(self.spares)):
+            spare_mode, filter = self.spares[i]
+            if spare_mode == mode:
+                self.spares.pop(i)
+                filter.frequency = frequency
+                filter.Q = Q
+                self.reused += 1
+                return filter
+        self.made += 1
+        return synthio.Biquad(mode, frequency=frequency, Q=Q)
+
+    def recycle(self, filter, mode):
+        """Give back a modulated filter that's no longer used"""
+        if len(self.spares) >= self.max_spare:
+            self.spares.pop(0)  # drop the oldest spare
+        self.spares.append((mode, filter))
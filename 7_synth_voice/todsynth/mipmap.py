@@ -0,0 +1,39 @@
+
+import ulab.numpy as np
+import synthio
+
+class WaveMipmap:
+    """Band-limited copies of a single-cycle waveform, one per octave,
+    so high notes don't alias. Copies are made once with an FFT, by
+    dropping the harmonics that would land above the Nyquist frequency
+    for the highest note in each octave. Waveform length must be a power of 2"""
+    def __init__(self, waveform, sample_rate=44100, base_note=24, num_octaves=9):
+        num = len(waveform)
+        if num & (num - 1):
+            raise ValueError("waveform length must be a power of 2")
+        self.base_note = base_note  # lowest note of first octave
+        self.waves = []
+        re, im = np.fft.fft(np.array(waveform, dtype=np.float))
+        for octave in range(num_octaves):
+            top_freq = synthio.midi_to_hz(base_note + 12 * (octave + 1))
+            max_harmonic = int((sample_rate / 2) / top_freq)
+            if max_harmonic >= num // 2:
+                self.waves.append(waveform)  # nothing to remove, share original
+                continue
+            max_harmonic = max(1, max_harmonic)  # always keep the fundamental
+            re2 = np.array(re)
+            im2 = np.array(im)
+            re2[max_harmonic+1 : num-max_harmonic] = 0  # zero upper harmonics
+            im2[max_harmonic+1 : num-max_harmonic] = 0  # and their mirror images
+            wave, _ = np.fft.ifft(re2, im2)
+            # removing harmonics makes it overshoot (Gibbs), so scale down
+            # instead of clipping, as clipping would add the harmonics back
+            peak = np.max(abs(wave))
+            if peak > 32767:
+                wave = wave * (32767 / peak)
+            self.waves.append(np.array(wave, dtype=np.int16))
+
+    def wave_for_note(self, midi_note):
+        """Get the band-limited waveform to use for a MIDI note"""
+        octave = int(midi_note - self.base_note) // 12
+        return self.waves[min(max(octave, 0), len(self.waves) - 1)]
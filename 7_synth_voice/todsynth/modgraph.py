@@ -0,0 +1,73 @@
+
+import synthio
+
+class Mod:
+    """Description of a synthio.LFO or synthio.Math block, made by lfo() or
+    math(). Inputs can be numbers, other Mods, or existing blocks"""
+    def __init__(self, kind, args, kwargs, per_voice):
+        self.kind = kind  # synthio.LFO or synthio.Math
+        self.args = args
+        self.kwargs = kwargs
+        self.per_voice = per_voice  # True if each voice needs its own
+
+def lfo(per_voice=False, **kwargs):
+    """Describe a synthio.LFO. once=True LFOs get retriggered per note, so
+    they're always per_voice"""
+    return Mod(synthio.LFO, (), kwargs, per_voice or kwargs.get('once', False))
+
+def math(operation, a, b=0.0, c=1.0, per_voice=False):
+    """Describe a synthio.Math"""
+    return Mod(synthio.Math, (operation, a, b, c), {}, per_voice)
+
+def _key_of(value):
+    # numbers and names compare by value, blocks and arrays by identity
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    return id(value)
+
+class ModGraph:
+    """Builds synthio blocks from Mod descriptions, handing out the same
+    block to everyone who asks for an identical one (same kind, same inputs),
+    so N voices with the same vibrato run one LFO instead of N.
+    Per-voice Mods, and anything fed by one, are always made new"""
+    def __init__(self):
+        self.blocks = {}  # key -> shared block
+        self.requested = 0  # blocks asked for
+        self.made = 0  # blocks actually made
+
+    @property
+    def shared(self):
+        """How many blocks were saved by sharing"""
+        return self.requested - self.made
+
+    def build(self, mod):
+        """Get a block for a Mod, building its inputs first"""
+        if not isinstance(mod, Mod):
+            return mod  # a number or an already made block
+        args = [self.build(arg) for arg in mod.args]
+        kwargs = {}
+        for name, value in mod.kwargs.items():
+            kwargs[name] = self.build(value)
+        self.requested += 1
+        key = None
+        if not mod.per_voice:
+            key = (mod.kind, tuple(_key_of(arg) for arg in args),
+                   tuple(sorted((name, _key_of(value))
+                                for name, value in kwargs.items())))
+            if (block := self.blocks.get(key)) is not None:
+                return block
+        block = mod.kind(*args, **kwargs)
+        self.made += 1
+        if key is not None:
+            self.blocks[key] = block
+        return block
+
+    def clear(self):
+        """Forget all shared blocks"""
+        self.blocks = {}
+        self.requested = 0
+        self.made = 0
+
+    def __str__(self):
+        return "ModGraph(requested=%d, made=%d, shared=%d)" % (
+            self.requested, self.made, self.shared)
@@ -0,0 +1,116 @@
+
+import ulab.numpy as np
+
+# how a CC value (0-127) maps onto 0-1 before scaling by amount
+CURVES = {
+    'linear': lambda x: x,
+    'exp': lambda x: x * x,        # fine control at the low end
+    'log': lambda x: x ** 0.5,     # fine control at the high end
+}
+
+class CCMapping:
+    """One CC number controlling one patch parameter. The parameter change
+    for every possible CC value is worked out once, into a 128-entry table"""
+    def __init__(self, param, cc_num, amount, curve='linear'):
+        self.param = param  # the ParamMod this changes
+        self.cc_num = cc_num
+        self.amount = amount
+        curve_func = CURVES[curve] if isinstance(curve, str) else curve
+        self.table = np.array([amount * curve_func(i / 127) for i in range(128)])
+        self.value = self.table[0]  # current change to the parameter
+
+class ParamMod:
+    """A patch parameter controlled by one or more CCs, their changes are
+    added to the base value the parameter had when first connected"""
+    def __init__(self, name, base, integer=False):
+        self.name = name
+        self.base = base
+        self.integer = integer  # True to round the value to an int
+        self.mappings = []
+        self.dirty = False
+
+class ModMatrix:
+    """Maps MIDI CCs to patch parameters. control_change() only records the
+    latest value of each CC, and update() applies them, so a burst of CC
+    messages between two updates becomes a single parameter change"""
+    def __init__(self, set_parameter):
+        self.set_parameter = set_parameter  # function(name, value)
+        self.by_cc = [None] * 128  # list of CCMappings for each CC number
+        self.params = {}  # ParamMod by parameter name
+        self.cc_vals = bytearray(128)  # latest value of each CC
+        self.cc_dirty = bytearray(128)  # 1 if CC changed since last update
+        self.dirty_ccs = []  # CC numbers changed since last update
+
+    def connect(self, name, cc_num, amount, base, curve='linear', integer=False):
+        """Have cc_num change parameter name by up to amount from base,
+        rounded to an int if integer. If name is already connected,
+        its first base is kept"""
+        param = self.params.get(name)
+        if param is None:
+            param = self.params[name] = ParamMod(name, base, integer)
+        else:  # replace any existing mapping, base already has no CCs in it
+            self._remove_mapping(param, cc_num)
+        mapping = CCMapping(param, cc_num, amount, curve)
+        mapping.value = mapping.table[self.cc_vals[cc_num]]
+        param.mappings.append(mapping)
+        if self.by_cc[cc_num] is None:
+            self.by_cc[cc_num] = []
+        self.by_cc[cc_num].append(mapping)
+        if mapping.value:  # apply where the CC already is next update()
+            self._mark_dirty(cc_num)
+
+    def disconnect(self, name, cc_num):
+        """Stop cc_num changing parameter name. Returns the parameter's
+        base value if nothing controls it anymore, else None"""
+        param = self.params.get(name)
+        if param is None or not self._remove_mapping(param, cc_num):
+            return None
+        if not param.mappings:
+            del self.params[name]
+            return param.base
+        return None
+
+    def _remove_mapping(self, param, cc_num):
+        """Remove cc_num's mapping to param, returns True if there was one"""
+        mappings = self.by_cc[cc_num]
+        for mapping in mappings or ():
+            if mapping.param is param:
+                mappings.remove(mapping)
+                param.mappings.remove(mapping)
+                if not mappings:
+                    self.by_cc[cc_num] = None
+                return True
+        return False
+
+    def control_change(self, cc_num, cc_val):
+        """Record a new CC value, to be applied by the next update()"""
+        self.cc_vals[cc_num] = cc_val  # so a later connect() starts from it
+        if self.by_cc[cc_num] is not None:
+            self._mark_dirty(cc_num)
+
+    def _mark_dirty(self, cc_num):
+        if not self.cc_dirty[cc_num]:
+            self.cc_dirty[cc_num] = 1
+            self.dirty_ccs.append(cc_num)
+
+    def update(self):
+        """Apply CC changes since the last update, call once per loop"""
+        if not self.dirty_ccs:
+            return
+        dirty_params = []
+        for cc_num in self.dirty_ccs:
+            self.cc_dirty[cc_num] = 0
+            for mapping in self.by_cc[cc_num] or ():
+                mapping.value = mapping.table[self.cc_vals[cc_num]]
+                if not mapping.param.dirty:
+                    mapping.param.dirty = True
+                    dirty_params.append(mapping.param)
+        self.dirty_ccs.clear()
+        for param in dirty_params:
+            param.dirty = False
+            value = param.base
+            for mapping in param.mappings:
+                value += mapping.value
+            if param.integer:
+                value = round(value)
+            self.set_parameter(param.name, value)
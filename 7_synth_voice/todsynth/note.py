@@ -1,7 +1,21 @@
 import synthio
 
 class Note:
-    """Holder of a synthio.Note and any other needed per-note objects"""
-    def __init__(self, note:synthio.Note):
-        self.note = note
-
+    """Holder of the synthio.Notes of one voice (more than one when using
+    unison) and any other needed per-note objects.
+    Made once by a VoicePool and reused for every note it plays"""
+    def __init__(self, notes):
+        self.notes = notes  # list of synthio.Notes stacked in this voice
+        self.note = notes[0]
+        self.slot = 0  # index in the VoicePool, for per-voice objects
+        self.filters = []  # modulated synthio.Biquads used by notes
+        self.filter_mode = None  # synthio.FilterMode of filters
+        self.filter_envs = []  # FilterEnvelopes driving filters
+        self.amp_block = None  # synthio.Math for amplitude, when modulated
+        self.midi_note = None  # MIDI note this voice is (or was last) playing
+        self.channel = 0  # MIDI channel of midi_note
+        self.pressed = False
+        self.age = 0  # when it was last pressed, for stealing the oldest
+        self.prev = None  # links in the VoicePool's list of free voices
+        self.next = None
+        self.free = False
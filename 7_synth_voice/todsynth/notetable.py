@@ -0,0 +1,42 @@
+
+class NoteTable:
+    """Which voice is playing each MIDI note, for each MIDI channel.
+    Each channel is a fixed list of 128 slots indexed by MIDI note, made
+    the first time the channel is used. `count` is the number of active
+    notes on all channels. To go through the active notes, go through
+    the pressed voices of the VoicePool, there's at most num_voices"""
+    def __init__(self, num_channels=16):
+        self.slots = [None] * num_channels  # per channel, list of 128 voices
+        self.count = 0
+
+    def get(self, midi_note, channel=0):
+        """Get voice playing midi_note on channel, or None"""
+        slots = self.slots[channel]
+        return slots[midi_note] if slots else None
+
+    def add(self, midi_note, voice, channel=0):
+        slots = self.slots[channel]
+        if slots is None:
+            slots = self.slots[channel] = [None] * 128
+        if slots[midi_note] is None:
+            self.count += 1
+        slots[midi_note] = voice
+
+    def remove(self, midi_note, channel=0):
+        """Remove midi_note on channel, returning the voice it had"""
+        slots = self.slots[channel]
+        if slots is None:
+            return None
+        voice = slots[midi_note]
+        if voice is not None:
+            slots[midi_note] = None
+            self.count -= 1
+        return voice
+
+    def clear(self):
+        """Forget all notes on all channels"""
+        for slots in self.slots:
+            if slots:
+                for i in range(128):
+                    slots[i] = None
+        self.count = 0
@@ -1,9 +1,45 @@
 
+# every saved patch parameter and how it's packed in a patch bank file,
+# in the order they're stored (see patchbank.py)
+PATCH_FIELDS = (
+    ('name', '16s'),
+    ('waveform', '8s'),
+    ('detune', 'f'),
+    ('unison', 'B'),
+    ('unison_spread', 'f'),
+    ('attack_time', 'f'),
+    ('decay_time', 'f'),
+    ('release_time', 'f'),
+    ('sustain_level', 'f'),
+    ('attack_level', 'f'),
+    ('filter_type', '3s'),
+    ('filter_freq', 'f'),
+    ('filter_res', 'f'),
+    ('filter_env', 'B'),
+    ('filter_attack_time', 'f'),
+    ('filter_release_time', 'f'),
+    ('filter_freq_min', 'f'),
+    ('bend_range', 'f'),
+    ('bend_time', 'f'),
+    ('vibrato_rate', 'f'),
+    ('vibrato_depth', 'f'),
+    ('tremolo_rate', 'f'),
+    ('tremolo_depth', 'f'),
+)
+
 class Patch:
-    def __init__(self):
-        self.waveform ='saw' # name of waveform
+    # a fixed set of attributes, so every Patch is small
+    __slots__ = tuple(name for name, fmt in PATCH_FIELDS) + (
+        '_waveform', '_mipmap', '_filter_type')
+
+    def __init__(self, name='init'):
+        self.name = name
+        self.waveform ='saw' # name of waveform, or list of harmonic amplitudes
         self._waveform = None  # the actual wave used
-        self.detune = 1.001
+        self._mipmap = None  # band-limited copies of _waveform, per octave
+        self.detune = 1.001  # frequency ratio between unison notes
+        self.unison = 1  # how many notes to stack per voice
+        self.unison_spread = 0.5  # stereo spread of unison notes, 0-1
         # amplitude envelope parameters
         self.attack_time = 0
         self.decay_time = 0.05
@@ -16,14 +52,24 @@ class Patch:
         self.filter_freq = 4000
         self.filter_res = 1.2
         # filter envelope parameters
+        self.filter_env = True  # False for a fixed filter at filter_freq
         self.filter_attack_time = 0.1
         self.filter_release_time = 0.3
         self.filter_freq_min = 0
+        # pitch bend parameters
+        self.bend_range = 2  # semitones for a full pitch wheel
+        self.bend_time = 0  # seconds to smooth pitch wheel changes over
+        # modulation parameters
+        self.vibrato_rate = 5  # Hz
+        self.vibrato_depth = 0  # semitones, 0 = no vibrato
+        self.tremolo_rate = 4  # Hz
+        self.tremolo_depth = 0  # 0-1, 0 = no tremolo
         
     def __str__(self):
         return '%s(%s)' % (
             type(self).__name__,
-            ', '.join('%s=%s' % item for item in self.__dict__.items())
+            ', '.join('%s=%s' % (name, getattr(self, name))
+                      for name, fmt in PATCH_FIELDS)
         )
     def __repr__(self):
         return self.__str__()
@@ -0,0 +1,72 @@
+
+import struct
+
+from todsynth.patch import Patch, PATCH_FIELDS
+
+# Patch bank file format, all little-endian:
+#   header: magic "TSPB", version (uint16), number of patches (uint16)
+#   patches: one fixed-size record per patch, fields packed as in PATCH_FIELDS
+# Since records are all the same size, patch N is at a known offset.
+BANK_MAGIC = b"TSPB"
+BANK_VERSION = 1
+HEADER_FORMAT = "<4sHH"
+RECORD_FORMAT = "<" + "".join(fmt for name, fmt in PATCH_FIELDS)
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+def float32(value):
+    """value rounded to the float32 it's stored as in a bank"""
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+def pack_patch(patch):
+    """Pack a Patch into a bank record"""
+    values = []
+    for name, fmt in PATCH_FIELDS:
+        value = getattr(patch, name)
+        if fmt.endswith('s'):
+            if not isinstance(value, str):
+                raise ValueError("can only save named %s, not %s" % (name, value))
+            value = value.encode()
+        values.append(value)
+    return struct.pack(RECORD_FORMAT, *values)
+
+def unpack_patch(record, patch=None):
+    """Unpack a bank record into patch, or a new Patch"""
+    patch = patch or Patch()
+    values = struct.unpack(RECORD_FORMAT, record)
+    for (name, fmt), value in zip(PATCH_FIELDS, values):
+        if fmt.endswith('s'):
+            value = value.rstrip(b'\0').decode()
+        setattr(patch, name, value)
+    return patch
+
+def save_patches(filepath, patches):
+    """Write a list of Patches to a patch bank file"""
+    with open(filepath, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, BANK_MAGIC, BANK_VERSION, len(patches)))
+        for patch in patches:
+            f.write(pack_patch(patch))
+
+class PatchBank:
+    """A patch bank file, reading just the patch asked for"""
+    def __init__(self, filepath):
+        self.f = open(filepath, 'rb')
+        magic, version, self.count = struct.unpack(HEADER_FORMAT,
+                                                   self.f.read(HEADER_SIZE))
+        if magic != BANK_MAGIC or version != BANK_VERSION:
+            raise ValueError("not a patch bank")
+        self.record = bytearray(RECORD_SIZE)  # reused for every read
+
+    def __len__(self):
+        return self.count
+
+    def load(self, patch_num, patch=None):
+        """Read patch number patch_num, into patch if given (to save RAM)"""
+        if not 0 <= patch_num < self.count:
+            raise IndexError("no patch %d" % patch_num)
+        self.f.seek(HEADER_SIZE + patch_num * RECORD_SIZE)
+        self.f.readinto(self.record)
+        return unpack_patch(self.record, patch)
+
+    def deinit(self):
+        self.f.close()
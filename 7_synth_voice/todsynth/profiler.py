@@ -0,0 +1,114 @@
+
+import time
+import gc
+from array import array
+try:
+    import tracemalloc  # CPython only
+except ImportError:
+    tracemalloc = None
+
+PRESS = 0
+RELEASE = 1
+TICK = 2
+KIND_NAMES = ('press', 'release', 'tick')
+NUM_BINS = 16  # histogram bin n counts times up to 2**n usecs, last bin the rest
+
+def _bin(usecs):
+    """Which histogram bin a time goes in, roughly log2(usecs)"""
+    b = 0
+    while usecs and b < NUM_BINS - 1:
+        usecs >>= 1
+        b += 1
+    return b
+
+class Profiler:
+    """Records how long Synth.press(), release() and update() take, how many
+    bytes they allocate, and how many notes are pressed after, into a ring
+    buffer of the last `size` events. Everything is made up front, so
+    recording doesn't grow anything (though on a board the timestamps
+    themselves are big ints). Also keeps histograms of how long each kind
+    of event takes, and of tick jitter: how much each update() interval
+    differs from the one before. Call dump() to get it all out.
+    Allocations use gc.mem_free() on a board. On a computer, set
+    trace_allocs to start tracemalloc, which slows everything down"""
+    def __init__(self, size=256, trace_allocs=False):
+        self.size = size
+        self.kinds = bytearray(size)
+        self.stamps = array('L', [0] * size)  # usecs since profiler made
+        self.usecs = array('L', [0] * size)  # how long each event took
+        self.allocs = array('l', [0] * size)  # bytes allocated by each event
+        self.voices = bytearray(size)  # notes pressed after each event
+        self.hists = array('L', [0] * (len(KIND_NAMES) * NUM_BINS))
+        self.jitter_hist = array('L', [0] * NUM_BINS)
+        self.count = 0  # events recorded, the ring has the last `size`
+        self._mem_free = getattr(gc, 'mem_free', None)
+        if trace_allocs and tracemalloc and not self._mem_free:
+            tracemalloc.start()
+        self._depth = 0  # so press() calling release() counts as one press
+        self._start = 0
+        self._mem = 0
+        self._last_tick = 0
+        self._last_interval = 0
+        self._t0 = time.monotonic_ns()
+
+    def _mem_used(self):
+        if self._mem_free:
+            return -self._mem_free()
+        if tracemalloc and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return 0
+
+    def begin(self):
+        """Call at the start of an event"""
+        self._depth += 1
+        if self._depth == 1:
+            self._mem = self._mem_used()
+            self._start = time.monotonic_ns()
+
+    def end(self, kind, voices):
+        """Call at the end of an event of kind PRESS, RELEASE or TICK"""
+        self._depth -= 1
+        if self._depth:
+            return
+        now = time.monotonic_ns()
+        usecs = (now - self._start) // 1000
+        i = self.count % self.size
+        self.kinds[i] = kind
+        self.stamps[i] = ((self._start - self._t0) // 1000) & 0xffffffff
+        self.usecs[i] = min(usecs, 0xffffffff)
+        self.allocs[i] = self._mem_used() - self._mem
+        self.voices[i] = min(voices, 255)
+        self.count += 1
+        self.hists[kind * NUM_BINS + _bin(usecs)] += 1
+        if kind == TICK:
+            if self._last_tick:
+                interval = (self._start - self._last_tick) // 1000
+                if self._last_interval:
+                    self.jitter_hist[_bin(abs(interval - self._last_interval))] += 1
+                self._last_interval = interval
+            self._last_tick = self._start
+
+    def clear(self):
+        self.count = 0
+        for i in range(len(self.hists)):
+            self.hists[i] = 0
+        for i in range(NUM_BINS):
+            self.jitter_hist[i] = 0
+        self._last_tick = 0
+        self._last_interval = 0
+
+    def dump(self, f=None):
+        """Print the recorded events, oldest first, then the histograms,
+        as CSV to f (an open file) or the console"""
+        out = f.write if f else lambda s: print(s, end='')
+        out("kind,stamp_us,usecs,alloc_bytes,voices\n")
+        first = max(0, self.count - self.size)
+        for n in range(first, self.count):
+            i = n % self.size
+            out("%s,%d,%d,%d,%d\n" % (KIND_NAMES[self.kinds[i]], self.stamps[i],
+                                      self.usecs[i], self.allocs[i], self.voices[i]))
+        out("histogram,up_to_us,%s,jitter\n" % ','.join(KIND_NAMES))
+        for b in range(NUM_BINS):
+            counts = [self.hists[k * NUM_BINS + b] for k in range(len(KIND_NAMES))]
+            out("histogram,%d,%s,%d\n" % (2 ** b, ','.join(str(c) for c in counts),
+                                          self.jitter_hist[b]))
@@ -1,12 +1,20 @@
-import random
 import ulab.numpy as np
 import synthio
 
 from todsynth import Note
 from todsynth import Patch
-
-NUM = 128    # number of samples in oscillator waveforms
-VOL = 32000  # volume (amplitude) of samples, max is +32767
+from todsynth.patch import PATCH_FIELDS
+from todsynth.patchbank import float32
+from todsynth.mipmap import WaveMipmap
+from todsynth.voicepool import VoicePool, STEAL_OLDEST
+from todsynth.notetable import NoteTable
+from todsynth.modmatrix import ModMatrix
+from todsynth.waveforms import NUM, VOL, Waveforms, waveform_for
+from todsynth.filter_envelope import FilterEnvelope
+from todsynth.filters import FilterFactory
+from todsynth.envelope_pool import EnvelopePool
+from todsynth.modgraph import ModGraph, lfo, math
+from todsynth.profiler import PRESS, RELEASE, TICK
 
 FILTER_TYPES = {
     'lpf' : synthio.FilterMode.LOW_PASS,
@@ -14,64 +22,352 @@ FILTER_TYPES = {
     'bpf' : synthio.FilterMode.BAND_PASS,
     }
 
-WAVEFORMS = {
-    'saw' : np.linspace(VOL, -VOL, num=NUM, dtype=np.int16),
-    'sine': np.array(np.sin(np.linspace(0, 2*np.pi, NUM, endpoint=False)) * VOL, dtype=np.int16),
-    'square': np.concatenate((np.ones(NUM // 2, dtype=np.int16) * VOL,
-                              np.zeros(NUM // 2, dtype=np.int16) * -VOL)),
-    'noise': np.array([random.randint(-VOL, VOL) for i in range(NUM)], dtype=np.int16),
-}
+# how each patch parameter is stored, by name
+PATCH_FORMATS = dict(PATCH_FIELDS)
+
+# most notes a synthio.Synthesizer plays at once, more are silently dropped
+MAX_NOTES = 12
+
+# waveforms are made the first time a patch uses them
+WAVEFORMS = Waveforms()
 
 class Synth:
     
-    def __init__(self, synth:synthio.Synthesizer, patch=None):
+    def __init__(self, synth:synthio.Synthesizer, patch=None,
+                 num_voices=8, steal=STEAL_OLDEST, share_filters=True,
+                 profiler=None):
         self.synth = synth
+        self.profiler = profiler  # a todsynth.Profiler to record timings in
+        self.num_voices = num_voices  # max notes sounding at once
+        # the host stand-in can be told to play more than MAX_NOTES
+        self.max_notes = getattr(synth, 'max_polyphony', MAX_NOTES)
+        self.steal = steal  # how to pick a voice to steal, see voicepool.py
+        # unison notes in a voice share one filter & filter envelope
+        self.share_filters = share_filters
+        self.filter_factory = FilterFactory()
+        self.filter_env_pool = EnvelopePool(0, self._make_filter_env)
+        self.mod_graph = ModGraph()  # shares identical mod blocks across voices
+        self.pool = None
+        self.notes_pressed = NoteTable()  # voice for each MIDI note & channel
+        self.mod_matrix = ModMatrix(self.set_parameter)  # CCs to parameters
+        # one pitch bend shared by every voice, so bend() is O(1)
+        self.bend_pos = synthio.LFO(once=True, rate=1000,
+                                    waveform=np.array((0,32767), dtype=np.int16))
+        self.bend_block = synthio.Math(synthio.MathOperation.CONSTRAINED_LERP,
+                                       0, 0, self.bend_pos)
         self.load_patch(patch)
-        self.notes_pressed = {}
         
     def __repr__(self):
         return "Synth(",self.patch,")"
 
     def load_patch(self, patch):
         self.patch = patch or Patch()
-        self.patch._waveform = WAVEFORMS[self.patch.waveform]
-        self.patch._filter_type = FILTER_TYPES[self.patch.filter_type]
+        self._make_voices()
+
+    def _make_voices(self, value=None):
+        """Make all the voices now, so press() doesn't have to"""
+        self.release_all()
+        # each voice plays unison notes, so fewer voices fit in synthio
+        num_voices = min(self.num_voices,
+                         max(1, self.max_notes // self.patch.unison))
+        self.pool = VoicePool(self.synth, num_voices, self.steal,
+                              self.patch.unison)
+        self._update_mods()
+        self._update_unison()
+        self._update_waveform()
+        self._update_amp_env()
+        self._update_filters()
+
+    def apply_patch(self, patch):
+        """Change the current patch to match patch, only changing the
+        parameters that are different. Much faster than load_patch()"""
+        for name, fmt in PATCH_FIELDS:
+            value = getattr(patch, name)
+            current = getattr(self.patch, name)
+            if fmt == 'f':  # patches from a bank are float32, compare as that
+                if float32(value) == float32(current):
+                    continue
+            elif value == current:
+                continue
+            self.set_parameter(name, value)
+
+    def _update_waveform(self):
+        self.patch._waveform = waveform_for(self.patch.waveform)
+        # band-limited copies of waveform, so high notes don't need a filter
+        self.patch._mipmap = WaveMipmap(self.patch._waveform,
+                                        sample_rate=self.synth.sample_rate)
+        for voice in self.pool.voices:
+            if voice.midi_note is not None:
+                waveform = self.patch._mipmap.wave_for_note(voice.midi_note)
+                for note in voice.notes:
+                    note.waveform = waveform
+
+    def _update_amp_env(self, value=None):
+        # synthio.Envelopes can't be changed, so make one new one for all voices
+        self.amp_env = synthio.Envelope(attack_time=self.patch.attack_time,
+                                        decay_time=self.patch.decay_time,
+                                        release_time=self.patch.release_time,
+                                        attack_level=self.patch.attack_level,
+                                        sustain_level=self.patch.sustain_level)
+        for voice in self.pool.voices:
+            for note in voice.notes:
+                note.envelope = self.amp_env
+
+    def _update_mods(self, value=None):
+        """Hook up vibrato and tremolo to every voice. Each voice asks the
+        ModGraph for its blocks, and gets shared ones where they're the same"""
+        p = self.patch
+        self.mod_graph.clear()
+        bend = self.bend_block
+        if p.vibrato_depth:  # note.bend is in octaves
+            bend = math(synthio.MathOperation.SUM, self.bend_block,
+                        lfo(rate=p.vibrato_rate, scale=p.vibrato_depth / 12),
+                        0.0)  # SUM is a+b+c, and c defaults to 1 (an octave)
+        tremolo = None
+        if p.tremolo_depth:  # goes between 1-depth and 1
+            tremolo = lfo(rate=p.tremolo_rate, scale=p.tremolo_depth / 2,
+                          offset=1 - p.tremolo_depth / 2)
+        for voice in self.pool.voices:
+            voice_bend = self.mod_graph.build(bend)
+            voice.amp_block = None
+            if tremolo:  # each voice has its own velocity, so its own Math
+                voice.amp_block = self.mod_graph.build(
+                    math(synthio.MathOperation.PRODUCT, 1, tremolo, per_voice=True))
+            for note in voice.notes:
+                note.bend = voice_bend
+                note.amplitude = voice.amp_block or 1
+
+    def _update_unison(self, value=None):
+        """Work out each unison note's detune and panning"""
+        n = self.patch.unison
+        offsets = [i - (n-1)/2 for i in range(n)]  # centered around 0
+        widest = (n-1)/2 if n > 1 else 1  # outer notes pan to +/-unison_spread
+        self._detunes = [self.patch.detune ** offset for offset in offsets]
+        self._amplitude = 1 / n ** 0.5  # so stacks aren't that much louder
+        for voice in self.pool.voices:
+            for note, offset in zip(voice.notes, offsets):
+                note.panning = self.patch.unison_spread * offset / widest
+            if voice.pressed:
+                self._tune_voice(voice)
+
+    def _tune_voice(self, voice):
+        freq = synthio.midi_to_hz(voice.midi_note)
+        for note, detune in zip(voice.notes, self._detunes):
+            note.frequency = freq * detune
+
+    def _update_filters(self, value=None):
+        """Give every voice its filters from the filter factory. Without a
+        filter envelope, all voices share one static filter. With one, each
+        voice gets a filter per voice (shared by its unison notes) or a
+        filter per note, each driven by a FilterEnvelope"""
+        p = self.patch
+        p._filter_type = FILTER_TYPES[p.filter_type]
+        self.static_filter = None  # the filter all voices share, if static
+        if not p.filter_env:
+            self.static_filter = self.filter_factory.get_static(
+                p._filter_type, p.filter_freq, p.filter_res)
+        for voice in self.pool.voices:
+            for filter in voice.filters:
+                self.filter_factory.recycle(filter, voice.filter_mode)
+            voice.filters = []
+            voice.filter_mode = p._filter_type
+            if not p.filter_env:
+                voice.filter_envs = []
+                for note in voice.notes:
+                    note.filter = self.static_filter
+                continue
+            num_filters = 1 if self.share_filters else len(voice.notes)
+            self.filter_env_pool.resize(len(self.pool.voices) * num_filters)
+            first_slot = voice.slot * num_filters
+            voice.filter_envs = [self.filter_env_pool[first_slot + i]
+                                 for i in range(num_filters)]
+            for filter_env in voice.filter_envs:
+                voice.filters.append(self.filter_factory.get_modulated(
+                    p._filter_type, filter_env.env, p.filter_res))
+            for i, note in enumerate(voice.notes):
+                note.filter = voice.filters[min(i, num_filters-1)]
+        if p.filter_env:  # pooled filter envelopes may have old settings
+            self._update_filter_freq(p.filter_freq)
+            self._update_filter_freq_min(p.filter_freq_min)
+            self._update_filter_times(None)
+
+    def _make_filter_env(self):
+        p = self.patch
+        return FilterEnvelope(p.filter_freq, p.filter_freq_min,
+                              p.filter_attack_time, p.filter_release_time)
+
+    def _update_filter_freq(self, value):
+        if not self.patch.filter_env:  # one static filter, change it
+            self.filter_factory.retune(self.static_filter, value,
+                                       self.patch.filter_res)
+            return
+        for voice in self.pool.voices:
+            for filter_env in voice.filter_envs:
+                filter_env.max_freq = value
+                if voice.pressed:
+                    filter_env.env.b = value
+
+    def _update_filter_freq_min(self, value):
+        for voice in self.pool.voices:
+            for filter_env in voice.filter_envs:
+                filter_env.min_freq = value
+
+    def _update_filter_times(self, value):
+        attack_time = max(0.001, self.patch.filter_attack_time)
+        release_time = max(0.001, self.patch.filter_release_time)
+        for voice in self.pool.voices:
+            for filter_env in voice.filter_envs:
+                filter_env.attack_time = attack_time
+                filter_env.release_time = release_time
+
+    def _update_filter_res(self, value):
+        if not self.patch.filter_env:  # one static filter, change it
+            self.filter_factory.retune(self.static_filter,
+                                       self.patch.filter_freq, value)
+            return
+        for voice in self.pool.voices:
+            for filter in voice.filters:
+                filter.Q = value
+
+    # which patch parameters need more than just setting in the Patch,
+    # made once here so set_parameter() is a single dict lookup
+    PARAM_UPDATERS = {
+        'waveform': lambda self, value: self._update_waveform(),
+        'attack_time': _update_amp_env,
+        'decay_time': _update_amp_env,
+        'release_time': _update_amp_env,
+        'attack_level': _update_amp_env,
+        'sustain_level': _update_amp_env,
+        'filter_type': _update_filters,
+        'filter_env': _update_filters,
+        'filter_freq': _update_filter_freq,
+        'filter_freq_min': _update_filter_freq_min,
+        'filter_attack_time': _update_filter_times,
+        'filter_release_time': _update_filter_times,
+        'filter_res': _update_filter_res,
+        'detune': _update_unison,
+        'unison_spread': _update_unison,
+        'unison': _make_voices,
+        'vibrato_rate': _update_mods,
+        'vibrato_depth': _update_mods,
+        'tremolo_rate': _update_mods,
+        'tremolo_depth': _update_mods,
+    }
 
     def set_parameter(self, name, value):
-        """Set a patch parameter by name"""
-        pass
+        """Set a patch parameter by name, and change just the parts of
+        the voices that use it, instead of reloading the patch"""
+        if name.startswith('_') or not hasattr(self.patch, name):
+            raise AttributeError("no patch parameter '%s'" % name)
+        setattr(self.patch, name, value)
+        if updater := self.PARAM_UPDATERS.get(name):
+            updater(self, value)
 
-    def is_pressed(self, midi_note):
-        return self.notes_pressed.get(midi_note, None)
+    def is_pressed(self, midi_note, channel=0):
+        return self.notes_pressed.get(midi_note, channel)
     
-    def add_note(self, midi_note, note:Note):
-        self.notes_pressed[midi_note] = note
+    def add_note(self, midi_note, note:Note, channel=0):
+        self.notes_pressed.add(midi_note, note, channel)
         
-    def del_note(self, midi_note):
-        self.notes_pressed[midi_note] = None
+    def del_note(self, midi_note, channel=0):
+        self.notes_pressed.remove(midi_note, channel)
 
+    @property
+    def num_pressed(self):
+        """How many notes are pressed right now"""
+        return self.notes_pressed.count
 
-    def press(self, midi_note, velocity=127):
+    def press(self, midi_note, velocity=127, channel=0):
         """override this"""
-        if self.is_pressed(midi_note):
-            self.release(midi_note, 0)  # we're at max notes
-        tnote = Note(synthio.Note(synthio.midi_to_hz(midi_note)))
-        self.synth.press(tnote.note)
-        self.add_note(midi_note, tnote)
+        if self.profiler:
+            self.profiler.begin()
+        if self.is_pressed(midi_note, channel):
+            self.release(midi_note, 0, channel)  # we're at max notes
+        tnote = self.pool.alloc(midi_note)
+        if self.pool.stolen_note is not None:  # that note lost its voice
+            self.del_note(self.pool.stolen_note, tnote.channel)
+        tnote.channel = channel
+        self._tune_voice(tnote)
+        waveform = self.patch._mipmap.wave_for_note(midi_note)
+        amplitude = self._amplitude * velocity / 127
+        if tnote.amp_block:
+            tnote.amp_block.a = amplitude
+        for note in tnote.notes:
+            note.waveform = waveform
+            if not tnote.amp_block:
+                note.amplitude = amplitude
+        for filter_env in tnote.filter_envs:
+            filter_env.press()
+        if self.pool.stolen_note is not None:  # its notes are still pressed
+            self.synth.change(retrigger=tnote.notes)
+        else:
+            self.synth.press(tnote.notes)
+        self.add_note(midi_note, tnote, channel)
+        if self.profiler:
+            self.profiler.end(PRESS, self.notes_pressed.count)
 
-    def release(self, midi_note, velocity=127):
-        if tnote := self.is_pressed(midi_note):
-            self.synth.release(tnote.note)
-        self.del_note(midi_note)
+    def release(self, midi_note, velocity=127, channel=0):
+        if self.profiler:
+            self.profiler.begin()
+        if tnote := self.is_pressed(midi_note, channel):
+            for filter_env in tnote.filter_envs:
+                filter_env.release()
+            self.synth.release(tnote.notes)
+            self.pool.free(tnote)
+        self.del_note(midi_note, channel)
+        if self.profiler:
+            self.profiler.end(RELEASE, self.notes_pressed.count)
+
+    def release_all(self):
+        """Release every pressed note, on every channel"""
+        if self.pool:
+            for tnote in self.pool.pressed():
+                self.synth.release(tnote.notes)
+                self.del_note(tnote.midi_note, tnote.channel)
+                self.pool.free(tnote)
 
     def control_change(self, cc_num, cc_val):
-        pass
+        """Handle a MIDI CC message. Parameters connected to it are
+        changed on the next update(), so bursts of CCs cost one change"""
+        self.mod_matrix.control_change(cc_num, cc_val)
+
+    def update(self):
+        """Call this once each time through your main loop"""
+        if self.profiler:
+            self.profiler.begin()
+        self.mod_matrix.update()
+        if self.profiler:
+            self.profiler.end(TICK, self.notes_pressed.count)
 
     def bend(self, amount):
-        pass
+        """Bend all notes by amount (-1 to 1) times the patch's bend_range.
+        Every voice shares one bend block, so this is the same cost
+        for one note or all of them"""
+        value = amount * self.patch.bend_range / 12  # note.bend is in octaves
+        if self.patch.bend_time:  # glide from where we are to new bend
+            self.bend_block.a = self.bend_block.value
+            self.bend_block.b = value
+            self.bend_pos.rate = 1 / self.patch.bend_time
+            self.bend_pos.retrigger()
+        else:  # bend_pos stays at 1, so the bend is just b
+            self.bend_block.b = value
     
-    def connect_param_to_cc(self, name, cc_num, amount):
-        pass
+    def connect_param_to_cc(self, name, cc_num, amount, curve='linear'):
+        """Have MIDI CC cc_num change patch parameter name, from its current
+        value (or its value before CCs changed it, if already connected)
+        up to amount more at CC value 127. curve is 'linear', 'exp',
+        'log' or a function mapping 0-1 to 0-1. Number parameters only,
+        whole number ones (like unison) are rounded"""
+        fmt = PATCH_FORMATS.get(name)
+        if fmt is None:
+            raise AttributeError("no patch parameter '%s'" % name)
+        if fmt.endswith('s'):
+            raise ValueError("patch parameter '%s' isn't a number" % name)
+        self.mod_matrix.connect(name, cc_num, amount, getattr(self.patch, name),
+                                curve, integer=(fmt != 'f'))
 
     def disconnect_param_to_cc(self, name, cc_num):
-        pass
+        """Stop MIDI CC cc_num changing patch parameter name"""
+        base = self.mod_matrix.disconnect(name, cc_num)
+        if base is not None:  # nothing else controls it, put it back
+            self.set_parameter(name, base)
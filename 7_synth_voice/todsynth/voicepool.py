@@ -0,0 +1,113 @@
+
+import synthio
+
+from todsynth.note import Note
+
+STEAL_OLDEST = 'oldest'      # steal the voice pressed longest ago
+STEAL_QUIETEST = 'quietest'  # steal the voice with the lowest envelope level
+STEAL_SAME = 'same'          # reuse the voice that last played this same note
+
+class VoicePool:
+    """A fixed number of voices, made once, handed out on press and taken
+    back on release. Free voices are kept in a linked list, least recently
+    released first, so getting one is O(1). When none are free, a pressed
+    voice is stolen according to `steal`. Each voice has `unison` synthio.Notes"""
+    def __init__(self, synth:synthio.Synthesizer, num_voices=8, steal=STEAL_OLDEST,
+                 unison=1):
+        self.synth = synth  # for note_info() when stealing the quietest
+        self.steal = steal
+        self.voices = [Note([synthio.Note(frequency=440) for _ in range(unison)])
+                       for _ in range(num_voices)]
+        for slot, voice in enumerate(self.voices):
+            voice.slot = slot
+        self.allocs = 0  # voices handed out from the free list
+        self.steals = 0  # voices stolen from a pressed note
+        self.stolen_note = None  # MIDI note of voice stolen by last alloc()
+        self._age = 0
+        self._same = [None] * 128  # voice that last played each MIDI note
+        self._head = None  # free list, least recently released first
+        self._tail = None
+        for voice in self.voices:
+            self._push(voice)
+
+    def _push(self, voice):
+        """Put voice on the end of the free list"""
+        voice.prev = self._tail
+        voice.next = None
+        if self._tail:
+            self._tail.next = voice
+        else:
+            self._head = voice
+        self._tail = voice
+        voice.free = True
+
+    def _remove(self, voice):
+        """Take voice out of the free list, from wherever it is in it"""
+        if voice.prev:
+            voice.prev.next = voice.next
+        else:
+            self._head = voice.next
+        if voice.next:
+            voice.next.prev = voice.prev
+        else:
+            self._tail = voice.prev
+        voice.prev = voice.next = None
+        voice.free = False
+
+    def _steal_voice(self):
+        """Pick a pressed voice to steal"""
+        voices = self.voices
+        if self.steal == STEAL_QUIETEST:
+            victim, level = None, 0
+            for voice in voices:
+                state, voice_level = self.synth.note_info(voice.note)
+                if state == synthio.EnvelopeState.ATTACK:
+                    continue  # just pressed, so quiet but not for long
+                if (victim is None or voice_level < level or
+                        (voice_level == level and voice.age < victim.age)):
+                    victim, level = voice, voice_level
+            if victim:
+                return victim
+        # STEAL_OLDEST, and the others when there's nothing better
+        victim = voices[0]
+        for voice in voices:
+            if voice.age < victim.age:
+                victim = voice
+        return victim
+
+    def alloc(self, midi_note):
+        """Get a voice for midi_note. If it was stolen from another pressed
+        note, that note is left in `stolen_note`, else it's None"""
+        voice = None
+        if self.steal == STEAL_SAME:
+            voice = self._same[midi_note]
+            if voice and (not voice.free or voice.midi_note != midi_note):
+                voice = None  # it's been reused for something else
+        if voice is None:
+            voice = self._head
+        self.stolen_note = None
+        if voice:
+            self._remove(voice)
+            self.allocs += 1
+        else:
+            voice = self._steal_voice()
+            self.stolen_note = voice.midi_note
+            self.steals += 1
+        self._age += 1
+        voice.age = self._age
+        voice.midi_note = midi_note
+        voice.pressed = True
+        self._same[midi_note] = voice
+        return voice
+
+    def pressed(self):
+        """Iterate over the pressed voices, the active notes"""
+        for voice in self.voices:
+            if voice.pressed:
+                yield voice
+
+    def free(self, voice):
+        """Give a released voice back to the pool"""
+        voice.pressed = False
+        if not voice.free:
+            self._push(voice)
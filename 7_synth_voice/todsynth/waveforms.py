@@ -0,0 +1,89 @@
+
+import os
+import ulab.numpy as np
+
+NUM = 128    # number of samples in oscillator waveforms
+VOL = 32000  # volume (amplitude) of samples, max is +32767
+
+def make_saw(num, vol):
+    return np.linspace(vol, -vol, num=num, dtype=np.int16)
+
+def make_sine(num, vol):
+    return np.array(np.sin(np.linspace(0, 2*np.pi, num, endpoint=False)) * vol,
+                    dtype=np.int16)
+
+def make_square(num, vol):
+    return np.concatenate((np.ones(num // 2, dtype=np.int16) * vol,
+                           np.ones(num - num // 2, dtype=np.int16) * -vol))
+
+def make_noise(num, vol):
+    # random bytes viewed as int16 gives us the whole array in one go
+    noise = np.frombuffer(os.urandom(num * 2), dtype=np.int16)
+    return np.array(noise * (vol / 32768), dtype=np.int16)
+
+SHAPES = {
+    'saw': make_saw,
+    'sine': make_sine,
+    'square': make_square,
+    'noise': make_noise,
+}
+
+_waveforms = {}  # made so far, keyed by (shape, num, vol)
+
+def get_waveform(shape, num=NUM, vol=VOL):
+    """Get a waveform by shape name, only making it the first time it's asked
+    for. Everyone gets the same array, so don't change it"""
+    key = (shape, num, vol)
+    wave = _waveforms.get(key)
+    if wave is None:
+        wave = SHAPES[shape](num, vol)
+        if hasattr(wave, 'flags'):  # numpy can make it read-only, ulab can't
+            wave.flags.writeable = False
+        _waveforms[key] = wave
+    return wave
+
+_additive = {}  # made so far, keyed by (spectrum, num, vol)
+
+def additive_waveform(amplitudes, phases=None, num=NUM, vol=VOL):
+    """Make a waveform from a list of harmonic amplitudes (the first is the
+    fundamental) and optional phases in radians, all at once with an inverse
+    FFT. The wave is scaled so its peak is vol. Made once per spectrum"""
+    key = (tuple(amplitudes), tuple(phases) if phases else None, num, vol)
+    wave = _additive.get(key)
+    if wave is not None:
+        return wave
+    n = min(len(amplitudes), num // 2 - 1)  # harmonics that fit
+    amps = np.array(amplitudes[:n], dtype=np.float) * (num / 2)
+    phis = np.array(phases[:n], dtype=np.float) if phases else np.zeros(n)
+    # spectrum of sum of amp*sin(k*t + phase), bins 1..n and their mirror
+    re = np.zeros(num)
+    im = np.zeros(num)
+    re[1:n+1] = amps * np.sin(phis)
+    im[1:n+1] = -amps * np.cos(phis)
+    re[num-n:] = re[n:0:-1]
+    im[num-n:] = -im[n:0:-1]
+    wave, _ = np.fft.ifft(re, im)
+    peak = np.max(abs(wave)) or 1
+    wave = np.array(wave * (vol / peak), dtype=np.int16)
+    if hasattr(wave, 'flags'):
+        wave.flags.writeable = False
+    _additive[key] = wave
+    return wave
+
+def waveform_for(spec):
+    """Get a waveform for a Patch.waveform: a shape name like 'saw',
+    or a list of harmonic amplitudes for additive_waveform()"""
+    if isinstance(spec, str):
+        return get_waveform(spec)
+    return additive_waveform(spec)
+
+class Waveforms:
+    """Dict-like lookup of default-sized waveforms by shape name"""
+    def __getitem__(self, shape):
+        return get_waveform(shape)
+
+    def __contains__(self, shape):
+        return shape in SHAPES
+
+    def keys(self):
+        return SHAPES.keys()
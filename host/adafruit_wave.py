@@ -0,0 +1,4 @@
+# host/adafruit_wave.py -- adafruit_wave is a subset of Python's wave
+# part of todbot circuitpython synthio tutorial
+#
+from wave import open, Error, Wave_read, Wave_write
@@ -0,0 +1,17 @@
+# host/analogio.py -- stand-in for CircuitPython's analogio
+# part of todbot circuitpython synthio tutorial
+#
+from hostsim import clock
+
+class AnalogIn:
+    """Reads the clock's knob position, set with run.py's --knob"""
+    def __init__(self, pin):
+        self.pin = pin
+        self.reference_voltage = 3.3
+
+    @property
+    def value(self):
+        return int(clock.knob_value() * 65535)
+
+    def deinit(self):
+        pass
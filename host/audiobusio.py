@@ -0,0 +1,10 @@
+# host/audiobusio.py -- stand-in for CircuitPython's audiobusio
+# part of todbot circuitpython synthio tutorial
+#
+from hostsim import AudioOut
+
+class I2SOut(AudioOut):
+    """Plays into the virtual clock, keeping what it played"""
+    def __init__(self, bit_clock, word_select, data, *, main_clock=None,
+                 left_justified=False):
+        super().__init__()
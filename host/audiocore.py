@@ -0,0 +1,45 @@
+# host/audiocore.py -- NumPy stand-in for CircuitPython's audiocore
+# part of todbot circuitpython synthio tutorial
+#
+import wave
+import numpy as np
+from hostsim import AudioSource
+
+class RawSample(AudioSource):
+    def __init__(self, buffer, *, channel_count=1, sample_rate=8000,
+                 single_buffer=True):
+        super().__init__(sample_rate, channel_count, 512)
+        self._set_samples(np.array(buffer, dtype=float))
+
+    def _set_samples(self, samples):
+        self._samples = samples.reshape(-1, self.channel_count)
+        self._pos = 0
+
+    def _start(self, loop=False):
+        super()._start(loop)
+        self._pos = 0
+
+    def _render_block(self):
+        if self._pos >= len(self._samples):
+            if not self._loop or not len(self._samples):
+                return None
+            self._pos = 0
+        block = self._samples[self._pos : self._pos + self.block_size]
+        self._pos += len(block)
+        return block
+
+    def deinit(self):
+        self._samples = np.zeros((0, self.channel_count))
+
+class WaveFile(RawSample):
+    def __init__(self, file, buffer=None):
+        with wave.open(file, 'rb') as w:
+            width = w.getsampwidth()
+            AudioSource.__init__(self, w.getframerate(), w.getnchannels(), 512)
+            data = w.readframes(w.getnframes())
+        if width == 1:  # 8-bit WAVs are unsigned
+            samples = (np.frombuffer(data, dtype=np.uint8) - 128.0) * 256
+        else:
+            samples = np.frombuffer(data, dtype=np.int16).astype(float)
+        self.bits_per_sample = width * 8
+        self._set_samples(samples)
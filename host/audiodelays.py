@@ -0,0 +1,66 @@
+# host/audiodelays.py -- NumPy stand-in for CircuitPython's audiodelays
+# part of todbot circuitpython synthio tutorial
+#
+# delay_ms changes once per buffer, not per sample, so Echo's freq_shift
+# and PitchShift's shifting aren't simulated, PitchShift passes audio through
+#
+import numpy as np
+from hosteffect import Effect, DelayLine
+from synthio import _value
+
+class Echo(Effect):
+    def __init__(self, max_delay_ms=500, delay_ms=250.0, decay=0.7, mix=0.25,
+                 buffer_size=512, sample_rate=8000, bits_per_sample=16,
+                 samples_signed=True, channel_count=1, freq_shift=False):
+        super().__init__(mix, buffer_size, sample_rate, channel_count)
+        self.max_delay_ms = max_delay_ms
+        self.delay_ms = delay_ms
+        self.decay = decay
+        self.freq_shift = freq_shift
+        self._line = DelayLine(int(max_delay_ms * sample_rate / 1000), channel_count)
+
+    def _process(self, x, tick, dt):
+        delay = int(_value(self.delay_ms, tick, dt) * self.sample_rate / 1000)
+        delay = min(max(delay, 1), len(self._line.buf) - 1)
+        decay = _value(self.decay, tick, dt)
+        out = np.empty_like(x)
+        pos = 0
+        while pos < len(x):  # feedback, so no more than delay at a time
+            n = min(len(x) - pos, delay)
+            wet = self._line.read(delay, n)
+            self._line.write(x[pos:pos+n] + wet * decay)
+            out[pos:pos+n] = wet
+            pos += n
+        return out
+
+class Chorus(Effect):
+    def __init__(self, max_delay_ms=50, delay_ms=50.0, voices=1.0, mix=0.5,
+                 buffer_size=512, sample_rate=8000, bits_per_sample=16,
+                 samples_signed=True, channel_count=1):
+        super().__init__(mix, buffer_size, sample_rate, channel_count)
+        self.max_delay_ms = max_delay_ms
+        self.delay_ms = delay_ms
+        self.voices = voices
+        self._line = DelayLine(int(max_delay_ms * sample_rate / 1000) + buffer_size,
+                               channel_count)
+
+    def _process(self, x, tick, dt):
+        self._line.write(x)
+        delay = _value(self.delay_ms, tick, dt) * self.sample_rate / 1000
+        voices = max(1, int(_value(self.voices, tick, dt)))
+        out = np.zeros_like(x)
+        max_delay = len(self._line.buf) - 1
+        for v in range(voices):  # voices spread out up to delay_ms
+            d = int(delay * (v + 1) / voices)
+            d = min(max(d, 0), max_delay - len(x)) + len(x)
+            out += self._line.read(d, len(x))
+        return out / voices
+
+class PitchShift(Effect):
+    def __init__(self, semitones=0.0, mix=1.0, window=1024, overlap=128,
+                 buffer_size=512, sample_rate=8000, bits_per_sample=16,
+                 samples_signed=True, channel_count=1):
+        super().__init__(mix, buffer_size, sample_rate, channel_count)
+        self.semitones = semitones
+        self.window = window
+        self.overlap = overlap
@@ -0,0 +1,61 @@
+# host/audiofilters.py -- NumPy stand-in for CircuitPython's audiofilters
+# part of todbot circuitpython synthio tutorial
+#
+import numpy as np
+from hosteffect import Effect
+from synthio import _value, biquad_block
+
+class DistortionMode:
+    CLIP = 0
+    LOFI = 1
+    OVERDRIVE = 2
+    WAVESHAPE = 3
+
+class Filter(Effect):
+    """filter can be a synthio.Biquad or a list of them, run in series"""
+    def __init__(self, filter=None, mix=1.0, buffer_size=512, sample_rate=8000,
+                 bits_per_sample=16, samples_signed=True, channel_count=1):
+        super().__init__(mix, buffer_size, sample_rate, channel_count)
+        self.filter = filter
+        self._states = []
+
+    def _process(self, x, tick, dt):
+        filters = self.filter
+        if filters is None:
+            return x
+        if not isinstance(filters, (list, tuple)):
+            filters = (filters,)
+        while len(self._states) < len(filters):
+            self._states.append(np.zeros((self.channel_count, 4)))
+        y = x.T  # one row per channel
+        for f, state in zip(filters, self._states):
+            coeffs = np.tile(f._get_coeffs(tick, dt, self.sample_rate),
+                             (self.channel_count, 1))
+            y = biquad_block(y, coeffs, state)
+        return y.T
+
+class Distortion(Effect):
+    """Rough version of the modes: gains are in dB, drive 0-1"""
+    def __init__(self, drive=0.0, pre_gain=0.0, post_gain=0.0,
+                 mode=DistortionMode.CLIP, soft_clip=False, mix=1.0,
+                 buffer_size=512, sample_rate=8000, bits_per_sample=16,
+                 samples_signed=True, channel_count=1):
+        super().__init__(mix, buffer_size, sample_rate, channel_count)
+        self.drive = drive
+        self.pre_gain = pre_gain
+        self.post_gain = post_gain
+        self.mode = mode
+        self.soft_clip = soft_clip
+
+    def _process(self, x, tick, dt):
+        drive = min(max(_value(self.drive, tick, dt), 0.0), 1.0)
+        y = x / 32768 * 10 ** (_value(self.pre_gain, tick, dt) / 20)
+        if self.mode == DistortionMode.LOFI:  # fewer bits the more drive
+            steps = 2 ** (16 - int(drive * 14))
+            y = np.round(y * steps) / steps
+        elif self.mode == DistortionMode.OVERDRIVE:
+            y = np.tanh(y * (1 + drive * 10))
+        elif self.mode == DistortionMode.WAVESHAPE:
+            y = np.sin(np.clip(y, -1, 1) * np.pi / 2 * (1 + drive * 3))
+        y = np.tanh(y) if self.soft_clip else np.clip(y, -1, 1)
+        return y * 10 ** (_value(self.post_gain, tick, dt) / 20) * 32768
@@ -0,0 +1,57 @@
+# host/audiomixer.py -- NumPy stand-in for CircuitPython's audiomixer
+# part of todbot circuitpython synthio tutorial
+#
+import numpy as np
+from hostsim import AudioSource
+from synthio import _next_tick, _value
+
+class MixerVoice:
+    def __init__(self, mixer):
+        self._mixer = mixer
+        self._sample = None
+        self.level = 1.0
+        self.loop = False
+
+    def play(self, sample, *, loop=False):
+        if sample.sample_rate != self._mixer.sample_rate:
+            raise ValueError("The sample's sample rate does not match the mixer's")
+        sample._start(loop)
+        self._sample = sample
+        self.loop = loop
+
+    def stop(self):
+        self._sample = None
+
+    @property
+    def playing(self):
+        return self._sample is not None and not self._sample._finished
+
+class Mixer(AudioSource):
+    def __init__(self, voice_count=2, buffer_size=1024, channel_count=2,
+                 bits_per_sample=16, samples_signed=True, sample_rate=8000):
+        super().__init__(sample_rate, channel_count, buffer_size)
+        self.voice = tuple(MixerVoice(self) for _ in range(voice_count))
+
+    def play(self, sample, *, voice=0, loop=False):
+        self.voice[voice].play(sample, loop=loop)
+
+    def stop_voice(self, voice=0):
+        self.voice[voice].stop()
+
+    @property
+    def playing(self):
+        return any(v.playing for v in self.voice)
+
+    def deinit(self):
+        for v in self.voice:
+            v.stop()
+
+    def _render_block(self):
+        tick = _next_tick()
+        dt = self.block_size / self.sample_rate
+        out = np.zeros((self.block_size, self.channel_count))
+        for v in self.voice:
+            if v._sample is not None:
+                level = _value(v.level, tick, dt)
+                out += v._sample._read(self.block_size, self.channel_count) * level
+        return np.clip(out, -32768, 32767, out=out)
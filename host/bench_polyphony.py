@@ -0,0 +1,187 @@
+# host/bench_polyphony.py -- how many voices of each chapter's sounds keep up
+# part of todbot circuitpython synthio tutorial
+#
+# e.g. "python3 host/bench_polyphony.py --json polyphony.json"
+# For each sound and each sample rate & buffer size, adds voices until
+# rendering a buffer takes longer than the buffer plays for, then reports
+# the most voices that kept up. This measures the host synthio stand-in,
+# so compare numbers run to run on one machine, not with a board.
+#
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+host_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(host_dir, '..')
+sys.path.insert(0, host_dir)
+sys.path.insert(0, os.path.join(root_dir, '3_filters'))
+sys.path.insert(0, os.path.join(root_dir, '4_oscillators_wavetables'))
+import ulab.numpy as np
+import synthio
+import audiomixer
+import audiodelays
+import audiofilters
+from filter_envelope import FilterEnvelope
+from wavetable import Wavetable
+
+CHANNEL_COUNT = 2
+WAVETABLE = os.path.join(root_dir, '4_oscillators_wavetables', 'wavetables', 'PLAITS02.WAV')
+
+def saw_wave():
+    return np.linspace(32000, -32000, num=256, dtype=np.int16)
+
+def notes_for(num_voices, **kwargs):
+    """num_voices notes spread over a few octaves"""
+    return [synthio.Note(synthio.midi_to_hz(36 + (i * 7) % 48), **kwargs)
+            for i in range(num_voices)]
+
+# each sound: make(synth, num_voices) -> (audio source to play, update func or None)
+# after Chapter 1, code_synth_setup.py
+def make_saw(synth, num_voices):
+    synth.press(notes_for(num_voices, waveform=saw_wave()))
+    return synth, None
+
+# after Chapter 3, code_filter_tryout.py
+def make_filtered(synth, num_voices):
+    notes = notes_for(num_voices, waveform=saw_wave())
+    for note in notes:
+        note.filter = synthio.Biquad(synthio.FilterMode.LOW_PASS, frequency=2000, Q=1.5)
+    synth.press(notes)
+    return synth, None
+
+# after Chapter 3, code_filter_envclass.py
+def make_filter_env(synth, num_voices):
+    notes = notes_for(num_voices, waveform=saw_wave())
+    envs = []
+    for note in notes:
+        env = FilterEnvelope(4000, 200, attack_time=0.5, release_time=0.5)
+        note.filter = synthio.Biquad(synthio.FilterMode.LOW_PASS, frequency=env.env, Q=1.5)
+        envs.append(env)
+    state = {'pressed': False}
+    def update():  # keep notes going up and down so the filters keep moving
+        state['pressed'] = not state['pressed']
+        for env, note in zip(envs, notes):
+            if state['pressed']:
+                env.press()
+            else:
+                env.release()
+    synth.press(notes)
+    return synth, update
+
+# after Chapter 4, code_wavetable_drone.py
+def make_wavetable(synth, num_voices):
+    wavetables = [Wavetable(WAVETABLE) for _ in range(num_voices)]
+    notes = notes_for(num_voices)
+    lfos = []
+    for i, (note, wavetable) in enumerate(zip(notes, wavetables)):
+        note.waveform = wavetable.waveform
+        lfo = synthio.LFO(rate=0.5, waveform=np.array((0, 32767), dtype=np.int16),
+                          scale=wavetable.num_waves - 1, phase_offset=i / num_voices)
+        synth.blocks.append(lfo)
+        lfos.append(lfo)
+    def update():
+        for wavetable, lfo in zip(wavetables, lfos):
+            wavetable.wave_pos = lfo.value
+    synth.press(notes)
+    return synth, update
+
+# after Chapter 6, code_demo.py
+def make_effects(synth, num_voices):
+    cfg = {'sample_rate': synth.sample_rate, 'channel_count': CHANNEL_COUNT,
+           'buffer_size': 512}
+    lpf = audiofilters.Filter(**cfg, mix=1.0, filter=synthio.Biquad(
+        synthio.FilterMode.LOW_PASS, frequency=3000, Q=1.2))
+    chorus = audiodelays.Chorus(**cfg, mix=0.5, max_delay_ms=50, voices=3,
+                                delay_ms=synthio.LFO(rate=0.5, offset=15, scale=5))
+    echo = audiodelays.Echo(**cfg, mix=0.4, max_delay_ms=330, delay_ms=330, decay=0.6)
+    echo.play(chorus)
+    chorus.play(lpf)
+    lpf.play(synth)
+    synth.press(notes_for(num_voices, waveform=saw_wave()))
+    return echo, None
+
+SOUNDS = {
+    'saw': make_saw,
+    'filtered': make_filtered,
+    'filter_env': make_filter_env,
+    'wavetable': make_wavetable,
+    'effects': make_effects,
+}
+
+def keeps_up(make, num_voices, sample_rate, buffer_size, num_buffers):
+    """Render num_buffers buffers like synth_setup.py's mixer would,
+    returns (True if none took longer than it plays, slowest in secs)"""
+    synth = synthio.Synthesizer(sample_rate=sample_rate, channel_count=CHANNEL_COUNT)
+    synth.max_polyphony = num_voices  # no 12 note limit here
+    mixer = audiomixer.Mixer(sample_rate=sample_rate, channel_count=CHANNEL_COUNT,
+                             buffer_size=buffer_size)
+    source, update = make(synth, num_voices)
+    mixer.voice[0].play(source)
+    mixer._start()
+    deadline = buffer_size / sample_rate
+    slowest = 0
+    for i in range(num_buffers + 2):
+        st = time.perf_counter()
+        if update:
+            update()
+        mixer.render(buffer_size)
+        if i >= 2:  # first ones are warming up
+            slowest = max(slowest, time.perf_counter() - st)
+    return slowest <= deadline, slowest
+
+def max_voices(make, sample_rate, buffer_size, num_buffers, limit):
+    """Double voices until a buffer is late, then narrow it down"""
+    good, bad = 0, None
+    n = 1
+    while n <= limit:
+        if keeps_up(make, n, sample_rate, buffer_size, num_buffers)[0]:
+            good = n
+            n *= 2
+        else:
+            bad = n
+            break
+    if bad is None:
+        return good
+    while bad - good > 1:
+        n = (good + bad) // 2
+        if keeps_up(make, n, sample_rate, buffer_size, num_buffers)[0]:
+            good = n
+        else:
+            bad = n
+    return good
+
+def main():
+    parser = argparse.ArgumentParser(description="max voices per sound, sample rate & buffer size")
+    parser.add_argument('--sounds', default=','.join(SOUNDS),
+                        help="comma-separated, from: %s" % ', '.join(SOUNDS))
+    parser.add_argument('--sample-rates', default='22050,44100')
+    parser.add_argument('--buffer-sizes', default='512,1024,2048')
+    parser.add_argument('--buffers', type=int, default=20, help="buffers timed per try")
+    parser.add_argument('--limit', type=int, default=256,
+                        help="most voices to try, results are capped at this")
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print("%-12s %11s %11s %10s" % ("sound", "sample_rate", "buffer_size", "max_voices"))
+    for name in args.sounds.split(','):
+        for sample_rate in (int(s) for s in args.sample_rates.split(',')):
+            for buffer_size in (int(b) for b in args.buffer_sizes.split(',')):
+                n = max_voices(SOUNDS[name], sample_rate, buffer_size,
+                               args.buffers, args.limit)
+                print("%-12s %11d %11d %10d" % (name, sample_rate, buffer_size, n))
+                results.append({'sound': name, 'sample_rate': sample_rate,
+                                 'buffer_size': buffer_size, 'max_voices': n})
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'engine': 'host synthio stand-in',
+                       'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
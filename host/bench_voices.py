@@ -0,0 +1,51 @@
+# host/bench_voices.py -- how fast the host synthio renders todsynth voices
+# part of todbot circuitpython synthio tutorial
+#
+# e.g. "python3 host/bench_voices.py", prints times faster than real time
+# for more and more voices of a few patches
+#
+import os
+import sys
+import time
+
+host_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, host_dir)
+sys.path.insert(0, os.path.join(host_dir, '..', '7_synth_voice'))
+import synthio
+import todsynth
+
+SAMPLE_RATE = 44100
+BUFFER_SIZE = 2048
+SECONDS = 5
+VOICE_COUNTS = (1, 2, 4, 8, 16, 32, 64)
+
+def make_patches():
+    plain = todsynth.Patch('static filter')
+    plain.filter_env = False
+    env = todsynth.Patch('filter env')
+    unison = todsynth.Patch('unison 3 vibrato')
+    unison.unison = 3
+    unison.vibrato_depth = 0.2
+    return (plain, env, unison)
+
+def bench(patch, num_voices):
+    """Render SECONDS of num_voices held notes, returns times real time"""
+    synth = synthio.Synthesizer(sample_rate=SAMPLE_RATE, channel_count=2)
+    synth.max_polyphony = num_voices * patch.unison  # no limit on a computer
+    tsynth = todsynth.Synth(synth, patch, num_voices=num_voices)
+    for i in range(num_voices):
+        tsynth.press(36 + i)
+    synth._start()
+    num_buffers = SECONDS * SAMPLE_RATE // BUFFER_SIZE
+    st = time.perf_counter()
+    for _ in range(num_buffers):
+        synth.render(BUFFER_SIZE)
+    elapsed = time.perf_counter() - st
+    return num_buffers * BUFFER_SIZE / SAMPLE_RATE / elapsed
+
+for patch in make_patches():
+    print("--- %s" % patch.name)
+    for num_voices in VOICE_COUNTS:
+        speed = bench(patch, num_voices)
+        print("%3d voices: %7.1fx real time, %7.1f voices real time" %
+              (num_voices, speed, speed * num_voices))
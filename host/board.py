@@ -0,0 +1,18 @@
+# host/board.py -- stand-in for CircuitPython's board, any pin name works
+# part of todbot circuitpython synthio tutorial
+#
+class Pin:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board.%s" % self.name
+
+_pins = {}
+
+def __getattr__(name):
+    if name.startswith('_'):
+        raise AttributeError(name)
+    if name not in _pins:
+        _pins[name] = Pin(name)
+    return _pins[name]
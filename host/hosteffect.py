@@ -0,0 +1,59 @@
+# host/hosteffect.py -- base of the audiodelays & audiofilters stand-ins
+# part of todbot circuitpython synthio tutorial
+#
+import numpy as np
+from hostsim import AudioSource
+from synthio import _next_tick, _value
+
+class Effect(AudioSource):
+    """Something that plays another source through _process() and mixes the
+    result with the dry sound by `mix`, a number or block"""
+    def __init__(self, mix=1.0, buffer_size=512, sample_rate=8000,
+                 channel_count=1, bits_per_sample=16, samples_signed=True):
+        super().__init__(sample_rate, channel_count, buffer_size)
+        self.mix = mix
+        self._source = None
+
+    def play(self, sample, *, loop=False):
+        sample._start(loop)
+        self._source = sample
+
+    def stop(self):
+        self._source = None
+
+    @property
+    def playing(self):
+        return self._source is not None and not self._source._finished
+
+    def deinit(self):
+        self.stop()
+
+    def _process(self, x, tick, dt):
+        return x
+
+    def _render_block(self):
+        tick = _next_tick()
+        dt = self.block_size / self.sample_rate
+        if self._source is None:
+            x = np.zeros((self.block_size, self.channel_count))
+        else:
+            x = self._source._read(self.block_size, self.channel_count)
+        mix = min(max(_value(self.mix, tick, dt), 0.0), 1.0)
+        out = x * (1 - mix) + self._process(x, tick, dt) * mix
+        return np.clip(out, -32768, 32767, out=out)
+
+class DelayLine:
+    """Circular buffer of past samples, for echoes & choruses"""
+    def __init__(self, max_samples, channel_count):
+        self.buf = np.zeros((max_samples + 1, channel_count))
+        self.pos = 0  # where the next sample gets written
+
+    def read(self, delay, num):
+        """Get num samples starting delay samples ago"""
+        idx = (self.pos - delay + np.arange(num)) % len(self.buf)
+        return self.buf[idx]
+
+    def write(self, x):
+        idx = (self.pos + np.arange(len(x))) % len(self.buf)
+        self.buf[idx] = x
+        self.pos = (self.pos + len(x)) % len(self.buf)
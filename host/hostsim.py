@@ -0,0 +1,206 @@
+# host/hostsim.py -- virtual clock and audio plumbing for the host stand-ins
+# part of todbot circuitpython synthio tutorial
+#
+# The stand-in modules in this directory (synthio, audiomixer, audiobusio, ...)
+# all share the one `clock` here. Time only passes while the script runs
+# (or sleeps, which is skipped over instantly), and as it passes every
+# playing audio output renders the audio it would have played by then.
+#
+import builtins
+import os
+import time
+import numpy as np
+
+_perf_counter = time.perf_counter
+
+class Done(BaseException):
+    """Raised when the clock reaches its limit, to stop the running script.
+    A BaseException so scripts' `except Exception:` don't catch it"""
+
+class Clock:
+    """Virtual time: real time spent running the script, plus time slept,
+    minus time spent rendering audio (which happens in the background on a board)"""
+    def __init__(self):
+        self.start = _perf_counter()
+        self.slept = 0.0  # seconds skipped over by sleep()
+        self.render_time = 0.0  # seconds spent rendering audio
+        self.limit = None  # stop the script at this many seconds
+        self.outputs = []  # AudioOuts playing something
+        self.record = True  # keep what outputs played, for writing to a WAV
+        self.knob = 0.5  # what AnalogIns read, 0-1 or 'sweep'
+        self.key_period = 0  # seconds between fake key presses, 0 = none
+        self.poll_time = 0.001  # secs a loop polling keys or MIDI takes on a board
+
+    def now(self):
+        return _perf_counter() - self.start - self.render_time + self.slept
+
+    def update(self):
+        """Render audio up to now, stop the script if out of time"""
+        t = self.now()
+        for out in self.outputs:
+            out._catch_up(t)
+        if self.limit is not None and t >= self.limit:
+            raise Done()
+
+    def poll(self):
+        """Polling for input, which doesn't come, so skip ahead a loop's worth"""
+        self.sleep(self.poll_time)
+
+    def sleep(self, secs):
+        if secs > 0:
+            self.slept += secs
+        self.update()
+
+    def monotonic(self):
+        self.update()
+        return self.now()
+
+    def monotonic_ns(self):
+        self.update()
+        return int(self.now() * 1_000_000_000)
+
+    def knob_value(self):
+        """Current knob position 0-1, 'sweep' goes up and down every 8 secs"""
+        if self.knob == 'sweep':
+            pos = (self.now() / 8) % 1
+            return 1 - abs(2 * pos - 1)
+        return self.knob
+
+clock = Clock()
+
+def install(root_dir):
+    """Make time.sleep(), time.monotonic() & time.monotonic_ns() use the clock,
+    and absolute paths like "/wavetables/" find files in root_dir like on CIRCUITPY"""
+    time.sleep = clock.sleep
+    time.monotonic = clock.monotonic
+    time.monotonic_ns = clock.monotonic_ns
+
+    real_stat = os.stat
+
+    def exists(path):
+        try:
+            real_stat(path)
+            return True
+        except OSError:
+            return False
+
+    def board_path(path):
+        if isinstance(path, str) and path.startswith('/') and not exists(path):
+            board = os.path.join(root_dir, path.lstrip('/'))
+            if exists(board) or not exists(os.path.dirname(path)):
+                return board
+        return path
+
+    def wrap(func):
+        return lambda path, *args, **kwargs: func(board_path(path), *args, **kwargs)
+    builtins.open = wrap(builtins.open)
+    os.listdir = wrap(os.listdir)
+    os.stat = wrap(os.stat)
+
+
+class AudioSource:
+    """Anything that can be played: Synthesizer, Mixer, effects, WaveFile.
+    Subclasses make audio a block at a time in _render_block(), as a float
+    array of shape (samples, channels) in int16 units, or None when done"""
+    def __init__(self, sample_rate, channel_count, block_size):
+        self.sample_rate = sample_rate
+        self.channel_count = channel_count
+        self.block_size = block_size
+        self._loop = False
+        self._finished = False
+        self._buf = np.zeros((0, channel_count))  # rendered but not yet read
+
+    def _start(self, loop=False):
+        """Called when plugged into something that plays it"""
+        self._loop = loop
+        self._finished = False
+        self._buf = np.zeros((0, self.channel_count))
+
+    def _render_block(self):
+        raise NotImplementedError
+
+    def _read(self, num_samples, channel_count=None):
+        """Get the next num_samples as floats, in channel_count channels"""
+        parts = [self._buf]
+        have = len(self._buf)
+        while have < num_samples:
+            block = None if self._finished else self._render_block()
+            if block is None:  # done playing, pad with silence
+                self._finished = True
+                block = np.zeros((num_samples - have, self.channel_count))
+            parts.append(block)
+            have += len(block)
+        buf = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        out, self._buf = buf[:num_samples], buf[num_samples:]
+        channel_count = channel_count or self.channel_count
+        if channel_count != self.channel_count:
+            out = out.mean(axis=1, keepdims=True)  # to mono
+            if channel_count > 1:
+                out = np.repeat(out, channel_count, axis=1)
+        return out
+
+    def render(self, num_samples):
+        """Get the next num_samples as interleaved int16, like a board plays"""
+        out = self._read(num_samples)
+        return np.clip(out, -32768, 32767).astype(np.int16).reshape(-1)
+
+
+class AudioOut:
+    """Where audio ends up, like audiobusio.I2SOut. Renders whatever it's
+    playing as the clock moves, keeping what it played in `recording`"""
+    min_samples = 64  # don't bother rendering less than this at a time
+
+    def __init__(self):
+        self._sample = None
+        self._paused = False
+        self._t0 = 0
+        self._num_rendered = 0
+        self.sample_rate = 0
+        self.channel_count = 0
+        self.recording = []  # int16 arrays as played
+
+    def play(self, sample, *, loop=False):
+        sample._start(loop)
+        self._sample = sample
+        self.sample_rate = sample.sample_rate
+        self.channel_count = sample.channel_count
+        self._t0 = clock.now()
+        self._num_rendered = 0
+        if self not in clock.outputs:
+            clock.outputs.append(self)
+
+    def stop(self):
+        self._sample = None
+        if self in clock.outputs:
+            clock.outputs.remove(self)
+
+    def pause(self):
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    @property
+    def playing(self):
+        return self._sample is not None
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def deinit(self):
+        self.stop()
+
+    def _catch_up(self, t):
+        n = int((t - self._t0) * self.sample_rate) - self._num_rendered
+        if n < self.min_samples:
+            return
+        st = _perf_counter()
+        self._num_rendered += n
+        if self._paused:
+            buf = np.zeros(n * self.channel_count, dtype=np.int16)
+        else:
+            buf = self._sample.render(n)
+        if clock.record:
+            self.recording.append(buf)
+        clock.render_time += _perf_counter() - st
@@ -0,0 +1,82 @@
+# host/keypad.py -- stand-in for CircuitPython's keypad
+# part of todbot circuitpython synthio tutorial
+#
+from hostsim import clock
+
+class Event:
+    def __init__(self, key_number=0, pressed=True):
+        self.key_number = key_number
+        self.pressed = pressed
+        self.timestamp = int(clock.now() * 1000)
+
+    @property
+    def released(self):
+        return not self.pressed
+
+    def __repr__(self):
+        return "<Event: key_number %d %s>" % (self.key_number,
+                                             "pressed" if self.pressed else "released")
+
+class EventQueue:
+    def __init__(self, keys, max_events):
+        self._keys = keys
+        self._events = []
+        self._max_events = max_events
+        self.overflowed = False
+
+    def _add(self, event):
+        if len(self._events) >= self._max_events:
+            self.overflowed = True
+            return
+        self._events.append(event)
+
+    def get(self):
+        clock.poll()
+        self._keys._scan()
+        return self._events.pop(0) if self._events else None
+
+    def get_into(self, event):
+        ev = self.get()
+        if ev is None:
+            return False
+        event.key_number = ev.key_number
+        event.pressed = ev.pressed
+        event.timestamp = ev.timestamp
+        return True
+
+    def clear(self):
+        self._events = []
+        self.overflowed = False
+
+    def __len__(self):
+        return len(self._events)
+
+    def __bool__(self):
+        return bool(self._events)
+
+class Keys:
+    """Keys are pressed by the clock: every clock.key_period seconds
+    (run.py's --keys) the next key is pressed for half a period"""
+    def __init__(self, pins, *, value_when_pressed, pull=True, interval=0.02,
+                 max_events=64, debounce_threshold=1):
+        self.key_count = len(pins)
+        self.events = EventQueue(self, max_events)
+        self._pressed = [False] * self.key_count
+
+    def _scan(self):
+        period = clock.key_period
+        down = -1
+        if period:
+            t = clock.now()
+            if t % period < period / 2:
+                down = int(t // period) % self.key_count
+        for k in range(self.key_count):
+            if self._pressed[k] != (k == down):
+                self._pressed[k] = (k == down)
+                self.events._add(Event(k, k == down))
+
+    def reset(self):
+        self._pressed = [False] * self.key_count
+
+    def deinit(self):
+        pass
@@ -0,0 +1,260 @@
+# host/render_midi.py -- render a MIDI file with a todsynth patch, to a WAV
+# part of todbot circuitpython synthio tutorial
+#
+# e.g. "python3 host/render_midi.py song.mid song.wav --bank patches.bank --patch 3"
+# Each track gets its own todsynth.Synth, and with --segment the song is also
+# cut into pieces, each started --preroll secs early with the notes held
+# by then pressed, so it sounds right by the time it starts. Each piece
+# is a fresh synth, so oscillator and LFO phases and filter state differ
+# from the piece before: pieces render --crossfade secs past their end and
+# fade into the next one, so the seams don't click. Tracks and pieces
+# render in a process pool and are mixed back together.
+#
+import argparse
+import multiprocessing
+import os
+import struct
+import sys
+import time
+import wave
+import numpy as np
+
+host_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, host_dir)
+sys.path.insert(0, os.path.join(host_dir, '..', '7_synth_voice'))
+import synthio
+import todsynth
+from todsynth.patchbank import PatchBank
+
+NOTE_OFF, NOTE_ON, CC, PITCH_BEND = 0x80, 0x90, 0xB0, 0xE0
+DATA_LENGTHS = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+
+def read_varlen(data, pos):
+    """Read a MIDI file variable-length number, returns (value, new pos)"""
+    value = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value = (value << 7) | (b & 0x7f)
+        if not b & 0x80:
+            return value, pos
+
+def read_track(data):
+    """Get the (tick, status, data0, data1) channel messages and
+    (tick, 'tempo', usecs_per_beat) of a track chunk"""
+    events = []
+    pos = 0
+    tick = 0
+    status = 0
+    while pos < len(data):
+        delta, pos = read_varlen(data, pos)
+        tick += delta
+        if data[pos] & 0x80:
+            status = data[pos]
+            pos += 1
+        # else running status, keep the last one
+        if status == 0xFF:  # meta event
+            kind = data[pos]
+            length, pos = read_varlen(data, pos + 1)
+            if kind == 0x51:
+                events.append((tick, 'tempo', int.from_bytes(data[pos:pos+3], 'big')))
+            pos += length
+        elif status in (0xF0, 0xF7):  # sysex
+            length, pos = read_varlen(data, pos)
+            pos += length
+        else:
+            n = DATA_LENGTHS[status & 0xF0]
+            d = data[pos:pos+n]
+            events.append((tick, status, d[0], d[1] if n > 1 else 0))
+            pos += n
+    return events
+
+def read_midi_file(filepath):
+    """Read a Standard MIDI File, returns a list of tracks, each a time
+    sorted list of (secs, status, data0, data1), only tracks with notes"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    magic, length, fmt, num_tracks, division = struct.unpack('>4sIHHH', data[:14])
+    if magic != b'MThd':
+        raise ValueError("not a MIDI file")
+    if division & 0x8000:
+        raise ValueError("SMPTE time isn't supported")
+    pos = 8 + length
+    tracks = []
+    while pos < len(data) and len(tracks) < num_tracks:
+        magic, length = struct.unpack('>4sI', data[pos:pos+8])
+        if magic == b'MTrk':
+            tracks.append(read_track(data[pos+8 : pos+8+length]))
+        pos += 8 + length
+    # tempo changes can be in any track, but apply to all of them
+    tempos = sorted((e[0], e[2]) for track in tracks for e in track if e[1] == 'tempo')
+    def to_secs(tick):
+        secs, last_tick, usecs_per_beat = 0.0, 0, 500000
+        for t, tempo in tempos:
+            if t >= tick:
+                break
+            secs += (t - last_tick) * usecs_per_beat / 1e6 / division
+            last_tick, usecs_per_beat = t, tempo
+        return secs + (tick - last_tick) * usecs_per_beat / 1e6 / division
+    out = []
+    for track in tracks:
+        events = [(to_secs(e[0]),) + e[1:] for e in track if e[1] != 'tempo']
+        if any(e[1] & 0xF0 == NOTE_ON for e in events):
+            out.append(events)
+    return out
+
+def make_patch(bank, patch_num, settings):
+    """Load patch_num from a patch bank, or the default Patch,
+    then set parameters from a list of "name=value" strings"""
+    if bank:
+        patch_bank = PatchBank(bank)
+        patch = patch_bank.load(patch_num)
+        patch_bank.deinit()
+    else:
+        patch = todsynth.Patch()
+    for setting in settings:
+        name, value = setting.split('=', 1)
+        for convert in (int, float, str):
+            try:
+                value = convert(value)
+                break
+            except ValueError:
+                pass
+        setattr(patch, name, value)
+    return patch
+
+def apply_event(tsynth, event):
+    _, status, data0, data1 = event
+    kind, channel = status & 0xF0, status & 0x0F
+    if kind == NOTE_ON and data1:
+        tsynth.press(data0, data1, channel)
+    elif kind in (NOTE_ON, NOTE_OFF):
+        tsynth.release(data0, data1, channel)
+    elif kind == CC:
+        tsynth.control_change(data0, data1)
+    elif kind == PITCH_BEND:
+        tsynth.bend(((data1 << 7 | data0) - 8192) / 8192)
+
+def render_part(job):
+    """Render one track from start to end secs, returns stereo float samples"""
+    events, patch_args, num_voices, sample_rate, start, end, preroll = job
+    patch = make_patch(*patch_args)
+    synth = synthio.Synthesizer(sample_rate=sample_rate, channel_count=2)
+    synth.max_polyphony = num_voices * patch.unison  # no 12 note limit here
+    tsynth = todsynth.Synth(synth, patch, num_voices=num_voices)
+    synth._start()
+    # get to how things are at preroll start: held notes, CCs, pitch bend
+    t0 = max(0.0, start - preroll)
+    held = {}  # (channel, note) -> event
+    i = 0
+    while i < len(events) and events[i][0] < t0:
+        event = events[i]
+        kind, channel = event[1] & 0xF0, event[1] & 0x0F
+        if kind == NOTE_ON and event[3]:
+            held[(channel, event[2])] = event
+        elif kind in (NOTE_ON, NOTE_OFF):
+            held.pop((channel, event[2]), None)
+        else:  # only the latest value matters
+            apply_event(tsynth, event)
+        i += 1
+    for event in held.values():
+        apply_event(tsynth, event)
+    tsynth.update()
+    # then render, discarding the preroll
+    pos = int(t0 * sample_rate)
+    start_pos = int(start * sample_rate)
+    end_pos = int(end * sample_rate)
+    out = []
+    while pos < end_pos:
+        next_pos = end_pos
+        if i < len(events):
+            next_pos = min(int(events[i][0] * sample_rate), end_pos)
+        if next_pos > pos:
+            buf = synth._read(next_pos - pos)
+            if next_pos > start_pos:
+                out.append(buf[max(0, start_pos - pos):])
+            pos = next_pos
+        while i < len(events) and int(events[i][0] * sample_rate) <= pos:
+            apply_event(tsynth, events[i])
+            i += 1
+        tsynth.update()  # CCs are applied here
+    return np.concatenate(out) if out else np.zeros((0, 2))
+
+def join_pieces(pieces, starts, sample_rate):
+    """Put one track's pieces end to end. Each piece was rendered past
+    the start of the next one, so crossfade them where they overlap"""
+    positions = [int(start * sample_rate) for start in starts]
+    out = np.zeros((positions[-1] + len(pieces[-1]), 2))
+    fade_in = np.zeros((0, 1))
+    for i, (piece, pos) in enumerate(zip(pieces, positions)):
+        piece[:len(fade_in)] *= fade_in
+        if i + 1 < len(pieces):
+            overlap = pos + len(piece) - positions[i + 1]
+            # raised cosine, fade_in + fade out add up to 1 everywhere
+            fade_in = 0.5 - 0.5 * np.cos(np.linspace(0, np.pi, overlap))[:, None]
+            piece[len(piece) - overlap:] *= 1 - fade_in
+        out[pos:pos + len(piece)] += piece
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="render a MIDI file with todsynth")
+    parser.add_argument('midi_file')
+    parser.add_argument('wav_file')
+    parser.add_argument('--bank', help="patch bank file to load the patch from")
+    parser.add_argument('--patch', type=int, default=0, help="patch number in --bank")
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help="set a patch parameter, can be used more than once")
+    parser.add_argument('--voices', type=int, default=8, help="voices per track")
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    parser.add_argument('--segment', type=float, default=0,
+                        help="cut tracks into pieces this many secs long, 0 = don't")
+    parser.add_argument('--preroll', type=float, default=2.0,
+                        help="secs to render before each piece, to settle into it")
+    parser.add_argument('--crossfade', type=float, default=0.03,
+                        help="secs each piece overlaps the next, to fade between them")
+    parser.add_argument('--tail', type=float, default=2.0,
+                        help="secs to keep rendering after the last event")
+    parser.add_argument('--merge', action='store_true',
+                        help="play all tracks on one synth instead of one each")
+    parser.add_argument('--gain', type=float, default=0.25,
+                        help="volume, like mixer.voice[0].level in synth_setup.py")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    tracks = read_midi_file(args.midi_file)
+    if args.merge:
+        tracks = [sorted((e for t in tracks for e in t), key=lambda e: e[0])]
+    length = max(t[-1][0] for t in tracks) + args.tail
+    segment = args.segment or length
+    starts = np.arange(0, length, segment)
+    patch_args = (args.bank, args.patch, args.set)
+    jobs = [(track, patch_args, args.voices, args.sample_rate,
+             start, min(start + segment + args.crossfade, length), args.preroll)
+            for track in tracks for start in starts]
+
+    st = time.perf_counter()
+    if args.jobs > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(args.jobs) as pool:
+            parts = pool.map(render_part, jobs)
+    else:
+        parts = [render_part(job) for job in jobs]
+    # pieces of each track end to end, then all tracks mixed
+    num_segments = len(starts)
+    mix = None
+    for t in range(len(tracks)):
+        track = join_pieces(parts[t * num_segments : (t + 1) * num_segments],
+                            starts, args.sample_rate)
+        mix = track if mix is None else mix[:len(track)] + track[:len(mix)]
+    elapsed = time.perf_counter() - st
+
+    mix = np.clip(mix * args.gain, -32768, 32767).astype(np.int16)
+    with wave.open(args.wav_file, 'wb') as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(args.sample_rate)
+        w.writeframes(mix.tobytes())
+    print("%s: %d tracks, %d jobs, %.1f secs of audio in %.2f secs (%.1fx real time)" %
+          (args.midi_file, len(tracks), len(jobs), length, elapsed, length / elapsed))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# host/run.py -- run tutorial code on a computer, saving what it plays
+# part of todbot circuitpython synthio tutorial
+#
+# e.g. "python3 host/run.py 2_modulation/code_vibrato.py --seconds 10 --wav vibrato.wav"
+# Uses the stand-ins for synthio, audiobusio, board, etc in this directory,
+# so only NumPy is needed. Time is virtual: sleeps are skipped over, so
+# scripts run as fast as they can render. Profile with "python3 -m cProfile"
+#
+import argparse
+import os
+import runpy
+import sys
+import time
+import wave
+import numpy as np
+
+host_dir = os.path.dirname(os.path.abspath(__file__))
+if host_dir not in sys.path:
+    sys.path.insert(0, host_dir)
+import hostsim
+
+def write_wav(filepath, out):
+    with wave.open(filepath, 'wb') as w:
+        w.setnchannels(out.channel_count)
+        w.setsampwidth(2)
+        w.setframerate(out.sample_rate)
+        w.writeframes(np.concatenate(out.recording).tobytes())
+
+def main():
+    parser = argparse.ArgumentParser(description="run tutorial code on a computer")
+    parser.add_argument('script', help="code.py to run")
+    parser.add_argument('--seconds', type=float, default=10,
+                        help="how long to run for, in virtual seconds")
+    parser.add_argument('--wav', help="save what was played to this WAV")
+    parser.add_argument('--knob', default='0.5',
+                        help="knob position 0-1, or 'sweep' to move them")
+    parser.add_argument('--keys', type=float, default=0,
+                        help="press a key every this many seconds")
+    args = parser.parse_args()
+
+    script = os.path.abspath(args.script)
+    wav = os.path.abspath(args.wav) if args.wav else None
+    os.chdir(os.path.dirname(script))  # scripts open files relative to themselves
+    sys.path.insert(0, os.path.dirname(script))
+    sys.argv = [script]
+
+    clock = hostsim.clock
+    clock.limit = args.seconds
+    clock.knob = args.knob if args.knob == 'sweep' else float(args.knob)
+    clock.key_period = args.keys
+    clock.record = wav is not None
+    hostsim.install(os.path.dirname(script))
+    st = time.perf_counter()  # not patched
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except hostsim.Done:
+        pass
+    wall_time = time.perf_counter() - st
+
+    played = sum(o._num_rendered / o.sample_rate for o in clock.outputs)
+    print("%s: %.1f secs played, rendered in %.2f secs (%.1fx real time), %.2f secs total" %
+          (args.script, played, clock.render_time,
+           played / clock.render_time if clock.render_time else 0, wall_time),
+          file=sys.stderr)
+    if wav and clock.outputs:
+        write_wav(wav, clock.outputs[0])
+
+if __name__ == '__main__':
+    main()
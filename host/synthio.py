@@ -0,0 +1,496 @@
+# host/synthio.py -- NumPy stand-in for CircuitPython's synthio
+# part of todbot circuitpython synthio tutorial
+#
+# Covers what the tutorial uses: Synthesizer, Note, Envelope, LFO, Math,
+# Biquad/BlockBiquad & midi_to_hz. Like the real synthio, LFOs, Maths,
+# envelopes & filter coefficients update once every BLOCK_SIZE samples,
+# oscillators don't interpolate, and the output saturates at 16 bits.
+#
+import math
+from collections import namedtuple
+import numpy as np
+from hostsim import AudioSource, clock
+
+BLOCK_SIZE = 256  # samples between LFO, envelope & filter updates
+MAX_POLYPHONY = 12  # notes one Synthesizer can play at once
+
+def midi_to_hz(midi_note):
+    return 440 * 2 ** ((midi_note - 69) / 12)
+
+class EnvelopeState:
+    ATTACK = 1
+    DECAY = 2
+    SUSTAIN = 3
+    RELEASE = 4
+
+class FilterMode:
+    LOW_PASS = 0
+    HIGH_PASS = 1
+    BAND_PASS = 2
+    NOTCH = 3
+    LOW_SHELF = 4
+    HIGH_SHELF = 5
+    PEAKING_EQ = 6
+
+class MathOperation:
+    SUM = 0
+    ADD_SUB = 1
+    PRODUCT = 2
+    MUL_DIV = 3
+    SCALE_OFFSET = 4
+    OFFSET_SCALE = 5
+    LERP = 6
+    CONSTRAINED_LERP = 7
+    DIV_ADD = 8
+    ADD_DIV = 9
+    MID = 10
+    MAX = 11
+    MIN = 12
+    ABS = 13
+
+def _div(a, b):
+    return a / b if b else 0.0
+
+_MATH_OPS = {
+    MathOperation.SUM: lambda a, b, c: a + b + c,
+    MathOperation.ADD_SUB: lambda a, b, c: a + b - c,
+    MathOperation.PRODUCT: lambda a, b, c: a * b * c,
+    MathOperation.MUL_DIV: lambda a, b, c: _div(a * b, c),
+    MathOperation.SCALE_OFFSET: lambda a, b, c: a * b + c,
+    MathOperation.OFFSET_SCALE: lambda a, b, c: (a + b) * c,
+    MathOperation.LERP: lambda a, b, c: a * (1 - c) + b * c,
+    MathOperation.CONSTRAINED_LERP: lambda a, b, c: a + (b - a) * min(max(c, 0), 1),
+    MathOperation.DIV_ADD: lambda a, b, c: _div(a, b) + c,
+    MathOperation.ADD_DIV: lambda a, b, c: _div(a + b, c),
+    MathOperation.MID: lambda a, b, c: sorted((a, b, c))[1],
+    MathOperation.MAX: lambda a, b, c: max(a, b, c),
+    MathOperation.MIN: lambda a, b, c: min(a, b, c),
+    MathOperation.ABS: lambda a, b, c: abs(a),
+}
+
+Envelope = namedtuple('Envelope', ('attack_time', 'decay_time', 'release_time',
+                                   'attack_level', 'sustain_level'),
+                      defaults=(0.1, 0.05, 0.2, 1.0, 0.8))
+_DEFAULT_ENVELOPE = Envelope()
+
+_tick_count = 0
+
+def _next_tick():
+    """Get a new tick id, each block of each renderer gets its own"""
+    global _tick_count
+    _tick_count += 1
+    return _tick_count
+
+class _Block:
+    """Base for LFO and Math, which compute a new value once per tick"""
+    _tick = None
+    value = 0.0
+
+    def _update(self, tick, dt):
+        if self._tick != tick:
+            self._tick = tick
+            self.value = self._compute(tick, dt)
+        return self.value
+
+def _value(x, tick, dt):
+    """Current value of a number or a block"""
+    if isinstance(x, _Block):
+        return x._update(tick, dt)
+    return x
+
+# starts at 0, up to 1, down to -1, back to 0
+_TRIANGLE = np.array([0, 32767, 0, -32767], dtype=np.int16)
+
+class LFO(_Block):
+    def __init__(self, waveform=None, *, rate=1.0, scale=1.0, offset=0.0,
+                 phase_offset=0.0, once=False, interpolate=True):
+        self.waveform = waveform
+        self.rate = rate
+        self.scale = scale
+        self.offset = offset
+        self.phase_offset = phase_offset
+        self.once = once
+        self.interpolate = interpolate
+        self._accum = 0.0  # 0-1 position in waveform
+
+    @property
+    def phase(self):
+        return self._accum
+
+    def retrigger(self):
+        self._accum = 0.0
+
+    def _compute(self, tick, dt):
+        wave = _TRIANGLE if self.waveform is None else self.waveform
+        num = len(wave)
+        phase = self._accum + _value(self.phase_offset, tick, dt)
+        if self.once:  # ramp from first to last sample, then stay there
+            pos = min(max(phase, 0.0), 1.0) * (num - 1)
+            i = int(pos)
+            j = min(i + 1, num - 1)
+        else:
+            pos = (phase % 1.0) * num
+            i = int(pos) % num
+            j = (i + 1) % num
+        v = float(wave[i])
+        if self.interpolate:
+            v += (float(wave[j]) - v) * (pos - int(pos))
+        self._accum += _value(self.rate, tick, dt) * dt
+        self._accum = min(self._accum, 1.0) if self.once else self._accum % 1.0
+        return _value(self.offset, tick, dt) + _value(self.scale, tick, dt) * v / 32768
+
+class Math(_Block):
+    def __init__(self, operation, a, b=0.0, c=1.0):
+        self.operation = operation
+        self.a = a
+        self.b = b
+        self.c = c
+
+    def _compute(self, tick, dt):
+        return _MATH_OPS[self.operation](_value(self.a, tick, dt),
+                                         _value(self.b, tick, dt),
+                                         _value(self.c, tick, dt))
+
+
+def _rbj_coeffs(mode, frequency, Q, A, sample_rate):
+    """Biquad coefficients (b0, b1, b2, a1, a2) from the RBJ cookbook"""
+    frequency = min(max(frequency, 1.0), sample_rate * 0.499)
+    Q = max(Q, 0.01)
+    w0 = 2 * math.pi * frequency / sample_rate
+    cw = math.cos(w0)
+    alpha = math.sin(w0) / (2 * Q)
+    gain = 10 ** ((A or 0) / 40)
+    if mode == FilterMode.LOW_PASS:
+        b = ((1 - cw) / 2, 1 - cw, (1 - cw) / 2)
+        a = (1 + alpha, -2 * cw, 1 - alpha)
+    elif mode == FilterMode.HIGH_PASS:
+        b = ((1 + cw) / 2, -(1 + cw), (1 + cw) / 2)
+        a = (1 + alpha, -2 * cw, 1 - alpha)
+    elif mode == FilterMode.BAND_PASS:
+        b = (alpha, 0.0, -alpha)
+        a = (1 + alpha, -2 * cw, 1 - alpha)
+    elif mode == FilterMode.NOTCH:
+        b = (1.0, -2 * cw, 1.0)
+        a = (1 + alpha, -2 * cw, 1 - alpha)
+    elif mode == FilterMode.PEAKING_EQ:
+        b = (1 + alpha * gain, -2 * cw, 1 - alpha * gain)
+        a = (1 + alpha / gain, -2 * cw, 1 - alpha / gain)
+    else:  # shelves
+        sq = 2 * math.sqrt(gain) * alpha
+        sign = 1 if mode == FilterMode.LOW_SHELF else -1
+        b = (gain * ((gain + 1) - sign * (gain - 1) * cw + sq),
+             sign * 2 * gain * ((gain - 1) - sign * (gain + 1) * cw),
+             gain * ((gain + 1) - sign * (gain - 1) * cw - sq))
+        a = ((gain + 1) + sign * (gain - 1) * cw + sq,
+             -sign * 2 * ((gain - 1) + sign * (gain + 1) * cw),
+             (gain + 1) + sign * (gain - 1) * cw - sq)
+    return (b[0] / a[0], b[1] / a[0], b[2] / a[0], a[1] / a[0], a[2] / a[0])
+
+class Biquad:
+    """A two-pole filter. frequency, Q & A can be numbers or blocks"""
+    def __init__(self, mode, frequency, Q=0.7071067811865475, A=None):
+        self.mode = mode
+        self.frequency = frequency
+        self.Q = Q
+        self.A = A
+        self._key = None
+        self._coeffs = None
+
+    def _get_coeffs(self, tick, dt, sample_rate):
+        key = (self.mode, _value(self.frequency, tick, dt), _value(self.Q, tick, dt),
+               _value(self.A, tick, dt), sample_rate)
+        if key != self._key:  # only recompute when something changed
+            self._key = key
+            self._coeffs = _rbj_coeffs(*key)
+        return self._coeffs
+
+BlockBiquad = Biquad
+
+def _powers(p, num):
+    """p**0 .. p**(num-1) for a column of p, by doubling, as ** is slow"""
+    out = np.empty((len(p), num), dtype=p.dtype)
+    out[:, 0] = 1
+    k = 1
+    pk = p[:, 0]
+    while k < num:
+        m = min(k, num - k)
+        out[:, k:k+m] = out[:, :m] * pk[:, None]
+        pk = pk * pk
+        k += m
+    return out
+
+def _impulse_response(a1, a2, num):
+    """First num samples of 1/(1 + a1/z + a2/z^2), for columns of a1 & a2,
+    worked out from its poles p1, p2"""
+    disc = np.sqrt((a1 * a1 - 4 * a2).astype(complex))
+    p1 = (-a1 + disc) / 2
+    p2 = (-a1 - disc) / 2
+    d = p1 - p2
+    same = np.abs(d) < 1e-6  # (nearly) repeated pole, avoid dividing by ~0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(same, np.arange(1, num + 1) * _powers(np.where(same, (p1 + p2) / 2, 0), num),
+                        (_powers(p1, num + 1)[:, 1:] - _powers(p2, num + 1)[:, 1:]) /
+                        np.where(same, 1, d)).real
+
+_spectra = {}  # (a1, a2, num) -> FFT of impulse response, filters mostly sit still
+
+def _feedback_spectra(a1, a2, num):
+    """FFTs of the feedback part of filters, one row per a1, a2"""
+    keys = [(k1, k2, num) for k1, k2 in zip(a1.tolist(), a2.tolist())]
+    missing = [k for k in dict.fromkeys(keys) if k not in _spectra]
+    if missing:
+        if len(_spectra) > 4096:
+            _spectra.clear()
+        m = np.array(missing)
+        g = _impulse_response(m[:, 0:1], m[:, 1:2], num)
+        for k, spectrum in zip(missing, np.fft.rfft(g, 2 * num)):
+            _spectra[k] = spectrum
+    return np.array([_spectra[k] for k in keys])
+
+def biquad_block(x, coeffs, state):
+    """Filter a block of x, shape (rows, samples), each row with its own
+    coefficients, shape (rows, 5), and state, shape (rows, 4) = last two
+    inputs & outputs, updated in place. Instead of running the filter
+    sample by sample, the block is convolved with the filter's impulse
+    response, so it's all array math"""
+    num = x.shape[1]
+    b0, b1, b2, a1, a2 = (coeffs[:, i:i+1] for i in range(5))
+    x1, x2, y1, y2 = (state[:, i:i+1] for i in range(4))
+    # feed-forward part, using last block's inputs
+    xe = np.concatenate((x2, x1, x), axis=1)
+    w = b0 * xe[:, 2:] + b1 * xe[:, 1:-1] + b2 * xe[:, :-2]
+    # last block's outputs kick the feedback part
+    w[:, :1] -= a1 * y1 + a2 * y2
+    w[:, 1:2] -= a2 * y1
+    size = 2 * num
+    spectra = _feedback_spectra(coeffs[:, 3], coeffs[:, 4], num)
+    y = np.fft.irfft(np.fft.rfft(w, size) * spectra, size)[:, :num]
+    state[:, 0] = x[:, -1]
+    state[:, 1] = x[:, -2]
+    state[:, 2] = y[:, -1]
+    state[:, 3] = y[:, -2]
+    return y
+
+
+class Note:
+    def __init__(self, frequency, *, panning=0.0, waveform=None,
+                 waveform_loop_start=0, waveform_loop_end=0x7fffffff,
+                 envelope=None, amplitude=1.0, bend=0.0, filter=None,
+                 ring_frequency=0.0, ring_bend=0.0, ring_waveform=None):
+        self.frequency = frequency
+        self.panning = panning
+        self.waveform = waveform
+        self.waveform_loop_start = waveform_loop_start
+        self.waveform_loop_end = waveform_loop_end
+        self.envelope = envelope
+        self.amplitude = amplitude
+        self.bend = bend
+        self.filter = filter
+        self.ring_frequency = ring_frequency  # ring mod isn't simulated
+        self.ring_bend = ring_bend
+        self.ring_waveform = ring_waveform
+
+class _Voice:
+    """A Synthesizer's playing state for one Note"""
+    def __init__(self, note):
+        self.note = note
+        self.state = EnvelopeState.ATTACK
+        self.level = 0.0  # envelope level
+        self.phase = 0.0  # position in waveform, in samples
+        self.filter_state = np.zeros(4)  # last two filter inputs & outputs
+
+    def step_envelope(self, env, dt):
+        """Move envelope along dt seconds, returns False when done releasing"""
+        if self.state == EnvelopeState.ATTACK:
+            if env.attack_time > 0:
+                self.level += env.attack_level * dt / env.attack_time
+            if env.attack_time <= 0 or self.level >= env.attack_level:
+                self.level = env.attack_level
+                self.state = EnvelopeState.DECAY
+        elif self.state == EnvelopeState.DECAY:
+            sustain = env.sustain_level * env.attack_level
+            if env.decay_time > 0:
+                self.level -= (env.attack_level - sustain) * dt / env.decay_time
+            if env.decay_time <= 0 or self.level <= sustain:
+                self.level = sustain
+                self.state = EnvelopeState.SUSTAIN
+        elif self.state == EnvelopeState.SUSTAIN:
+            self.level = env.sustain_level * env.attack_level
+        else:
+            if env.release_time > 0:
+                self.level -= env.attack_level * dt / env.release_time
+            if env.release_time <= 0 or self.level <= 0:
+                self.level = 0.0
+                return False
+        return True
+
+_SQUARE = np.array([32767, -32767], dtype=np.int16)  # default waveform
+
+
+class Synthesizer(AudioSource):
+    def __init__(self, *, sample_rate=11025, channel_count=1, waveform=None,
+                 envelope=None):
+        super().__init__(sample_rate, channel_count, BLOCK_SIZE)
+        self.waveform = waveform
+        self.envelope = envelope
+        self.blocks = []  # LFOs & Maths to run even if not on a Note
+        self.max_polyphony = MAX_POLYPHONY
+        self._voices = {}  # Note -> _Voice, in press order
+        self._int_notes = {}  # midi note number -> Note made for it
+
+    def _notes(self, notes):
+        """Turn int, Note, or a sequence of them into a list of Notes"""
+        if isinstance(notes, (int, Note)):
+            notes = (notes,)
+        out = []
+        for n in notes:
+            if isinstance(n, int):
+                note = self._int_notes.get(n)
+                if note is None:
+                    note = self._int_notes[n] = Note(midi_to_hz(n))
+                n = note
+            out.append(n)
+        return out
+
+    def press(self, press=()):
+        clock.update()  # render up to now first, so the note starts now
+        for note in self._notes(press):
+            voice = self._voices.get(note)
+            if voice:
+                if voice.state == EnvelopeState.RELEASE:
+                    voice.state = EnvelopeState.ATTACK
+                continue
+            if len(self._voices) >= self.max_polyphony:
+                # steal the quietest releasing note, or give up
+                releasing = [v for v in self._voices.values()
+                             if v.state == EnvelopeState.RELEASE]
+                if not releasing:
+                    continue
+                del self._voices[min(releasing, key=lambda v: v.level).note]
+            self._voices[note] = _Voice(note)
+
+    def release(self, release=()):
+        clock.update()
+        for note in self._notes(release):
+            if voice := self._voices.get(note):
+                voice.state = EnvelopeState.RELEASE
+
+    def change(self, release=(), press=(), retrigger=()):
+        clock.update()
+        self.release(release)
+        self.press(press)
+        for note in self._notes(retrigger):
+            if voice := self._voices.get(note):
+                voice.state = EnvelopeState.ATTACK
+            else:
+                self.press(note)
+
+    def release_then_press(self, release=(), press=()):
+        self.change(release, press)
+
+    def release_all(self):
+        self.release(list(self._voices))
+
+    def release_all_then_press(self, press=()):
+        self.change(list(self._voices), press)
+
+    @property
+    def pressed(self):
+        return tuple(n for n, v in self._voices.items()
+                     if v.state != EnvelopeState.RELEASE)
+
+    def note_info(self, note):
+        """Get (envelope state, envelope level) of a note, or (None, 0.0)"""
+        note = self._notes(note)[0]
+        voice = self._voices.get(note)
+        if voice is None:
+            return (None, 0.0)
+        return (voice.state, voice.level)
+
+    def low_pass_filter(self, frequency, Q=0.7071067811865475):
+        return Biquad(FilterMode.LOW_PASS, frequency, Q)
+
+    def high_pass_filter(self, frequency, Q=0.7071067811865475):
+        return Biquad(FilterMode.HIGH_PASS, frequency, Q)
+
+    def band_pass_filter(self, frequency, Q=0.7071067811865475):
+        return Biquad(FilterMode.BAND_PASS, frequency, Q)
+
+    def deinit(self):
+        self._voices = {}
+
+    def _render_block(self):
+        """Render all playing notes at once: control-rate things (envelopes,
+        LFOs, filter coefficients) are worked out per note, then the
+        oscillators, envelope ramps & filters run as (notes, samples) arrays"""
+        tick = _next_tick()
+        dt = BLOCK_SIZE / self.sample_rate
+        for block in self.blocks:
+            _value(block, tick, dt)
+        out = np.zeros((BLOCK_SIZE, self.channel_count))
+        voices = list(self._voices.values())
+        num = len(voices)
+        if not num:
+            return out
+        start_levels = np.empty(num)
+        end_levels = np.empty(num)
+        phases = np.empty(num)
+        incs = np.empty(num)
+        amps = np.empty(num)
+        pans = np.zeros(num)
+        starts = np.empty(num, dtype=np.intp)  # where each note's loop is in all_waves
+        loop_lens = np.empty(num)
+        waves = {}  # id(waveform) -> (offset in all_waves, waveform)
+        wave_len = 0
+        filtered = []  # (row, note's filter)
+        default_env = self.envelope or _DEFAULT_ENVELOPE
+        for i, voice in enumerate(voices):
+            note = voice.note
+            start_levels[i] = voice.level
+            if not voice.step_envelope(note.envelope or default_env, dt):
+                del self._voices[note]
+            end_levels[i] = voice.level
+            wave = note.waveform if note.waveform is not None else self.waveform
+            if wave is None:
+                wave = _SQUARE
+            entry = waves.get(id(wave))
+            if entry is None:  # first note using this waveform
+                entry = waves[id(wave)] = (wave_len, np.frombuffer(wave, dtype=np.int16))
+                wave_len += len(entry[1])
+            offset, wave = entry
+            loop_start = min(note.waveform_loop_start, len(wave) - 1)
+            loop_lens[i] = min(note.waveform_loop_end, len(wave)) - loop_start
+            starts[i] = offset + loop_start
+            freq = note.frequency * 2 ** _value(note.bend, tick, dt)
+            incs[i] = freq * loop_lens[i] / self.sample_rate
+            phases[i] = voice.phase
+            amps[i] = _value(note.amplitude, tick, dt)
+            if self.channel_count > 1:
+                pans[i] = _value(note.panning, tick, dt)
+            if note.filter is not None:
+                filtered.append((i, note.filter))
+
+        # oscillators: one lookup into all the waveforms, end to end
+        all_waves = np.concatenate([w for _, w in waves.values()])
+        n = np.arange(BLOCK_SIZE)
+        pos = (phases[:, None] + incs[:, None] * n) % loop_lens[:, None]
+        y = all_waves[starts[:, None] + pos.astype(np.intp)].astype(float)
+        for voice, phase in zip(voices, (phases + incs * BLOCK_SIZE) % loop_lens):
+            voice.phase = phase
+        # envelopes ramp across the block, times amplitude
+        levels = start_levels[:, None] + (end_levels - start_levels)[:, None] * (n / BLOCK_SIZE)
+        y *= levels * amps[:, None]
+        if filtered:  # all filtered notes in one go
+            rows = [i for i, _ in filtered]
+            coeffs = np.array([f._get_coeffs(tick, dt, self.sample_rate) for _, f in filtered])
+            state = np.array([voices[i].filter_state for i in rows])
+            y[rows] = biquad_block(y[rows], coeffs, state)
+            for i, st in zip(rows, state):
+                voices[i].filter_state = st
+        if self.channel_count == 1:
+            out[:, 0] = y.sum(axis=0)
+        else:
+            pans = np.clip(pans, -1, 1)
+            out[:, 0] = np.minimum(1, 1 - pans) @ y
+            out[:, 1] = np.minimum(1, 1 + pans) @ y
+        return np.clip(out, -32768, 32767, out=out)
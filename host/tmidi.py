@@ -0,0 +1,47 @@
+# host/tmidi.py -- stand-in for the tmidi library, receive() never gets anything
+# part of todbot circuitpython synthio tutorial
+#
+from hostsim import clock
+
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+AFTERTOUCH = 0xA0
+CONTROLLER_CHANGE = CC = 0xB0
+PROGRAM_CHANGE = 0xC0
+CHANNEL_PRESSURE = 0xD0
+PITCH_BEND = 0xE0
+SYSEX = 0xF0
+CLOCK = 0xF8
+START = 0xFA
+CONTINUE = 0xFB
+STOP = 0xFC
+
+class Message:
+    def __init__(self, type, channel=0, data0=0, data1=0):
+        self.type = type
+        self.channel = channel
+        self.data0 = data0
+        self.data1 = data1
+
+    note = property(lambda self: self.data0)
+    velocity = property(lambda self: self.data1)
+    control = property(lambda self: self.data0)
+    value = property(lambda self: self.data1)
+    pitch_bend = property(lambda self: self.data1 << 7 | self.data0)
+
+    def __repr__(self):
+        return "Message(type=0x%02x, channel=%d, data0=%d, data1=%d)" % (
+            self.type, self.channel, self.data0, self.data1)
+
+class MIDI:
+    def __init__(self, midi_in=None, midi_out=None, *, in_buf_size=128,
+                 enable_running_status=False):
+        self.midi_in = midi_in
+        self.midi_out = midi_out
+
+    def receive(self):
+        clock.poll()
+        return None
+
+    def send(self, msg, channel=None):
+        pass
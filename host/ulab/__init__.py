@@ -0,0 +1,2 @@
+# host/ulab -- stand-in for CircuitPython's ulab, using NumPy
+# part of todbot circuitpython synthio tutorial
@@ -0,0 +1,25 @@
+# host/ulab/numpy.py -- ulab.numpy stand-in using NumPy
+# part of todbot circuitpython synthio tutorial
+#
+# Only what differs from NumPy is changed: np.float, no 64/32-bit ints
+# (so code takes the same paths it does on a board), and an fft that
+# works on (real, imaginary) tuples
+#
+from numpy import *
+import numpy as _np
+
+float = _np.float64
+
+for _name in ('int32', 'uint32', 'int64', 'uint64'):
+    globals().pop(_name, None)
+
+class fft:
+    @staticmethod
+    def fft(re, im=None):
+        r = _np.fft.fft(re if im is None else re + 1j * im)
+        return r.real.copy(), r.imag.copy()
+
+    @staticmethod
+    def ifft(re, im=None):
+        r = _np.fft.ifft(re if im is None else re + 1j * im)
+        return r.real.copy(), r.imag.copy()
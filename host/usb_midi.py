@@ -0,0 +1,15 @@
+# host/usb_midi.py -- stand-in for CircuitPython's usb_midi, no MIDI comes in
+# part of todbot circuitpython synthio tutorial
+#
+class PortIn:
+    def read(self, nbytes=None):
+        return b''
+
+    def readinto(self, buf, nbytes=None):
+        return 0
+
+class PortOut:
+    def write(self, buf):
+        return len(buf)
+
+ports = (PortIn(), PortOut())